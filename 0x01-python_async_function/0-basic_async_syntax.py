@@ -2,11 +2,18 @@
 """ Basic async syntax """
 import asyncio
 import random
+from typing import Any, Awaitable, Callable
 
 
-async def wait_random(max_delay: int = 10) -> float:
-    """Basic async coroutine"""
+async def wait_random(max_delay: int = 10,
+                      sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+                      ) -> float:
+    """Basic async coroutine
+
+    ``sleep`` can be swapped for another primitive, such as the
+    ``sleep`` method of a TimingWheel.
+    """
     # uniform returns a floating num between two specified nums both included
     delay = random.uniform(0, max_delay)
-    await asyncio.sleep(delay)
+    await sleep(delay)
     return delay
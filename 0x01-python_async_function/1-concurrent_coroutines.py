@@ -1,15 +1,50 @@
 #!/usr/bin/env python3
 """ Executing multiple coroutines """
-from typing import List
+from typing import AsyncIterator, List, Optional
 import asyncio
 wait_random = __import__('0-basic_async_syntax').wait_random
 
 
-async def wait_n(n: int, max_delay: int) -> List[float]:
-    """ execute multiple coroutines at the same time """
+async def iter_wait_n(n: int, max_delay: int) -> AsyncIterator[float]:
+    """ yield each delay as soon as its coroutine completes
 
+    Closing the generator early, e.g. with ``await iterator.aclose()``
+    after a break, cancels the coroutines that are still running.
+    """
     routines = [asyncio.create_task(wait_random(max_delay)) for _ in range(n)]
+    try:
+        # as_completed method returns an iterator that yields
+        # coroutines as they are completed
+        for routine in asyncio.as_completed(routines):
+            yield await routine
+    finally:
+        for routine in routines:
+            routine.cancel()
+        await asyncio.gather(*routines, return_exceptions=True)
 
-    # as_completed method returns an asynchronous iterator that yields
-    # coroutines as they are completed
-    return [await routine for routine in asyncio.as_completed(routines)]
+
+async def wait_n(n: int, max_delay: int,
+                 concurrency: Optional[int] = None) -> List[float]:
+    """ execute multiple coroutines at the same time
+
+    With ``concurrency``, at most that many coroutines run at once: a
+    fixed pool of workers starts the next one whenever a slot frees up,
+    so memory stays flat however large ``n`` is. The delays are still
+    returned in completion order.
+    """
+    if concurrency is None:
+        return [delay async for delay in iter_wait_n(n, max_delay)]
+
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    delays: List[float] = []
+    # shared by the workers, each takes the next slot when it is free
+    slots = iter(range(n))
+
+    async def worker() -> None:
+        """ run coroutines one after another until none is left """
+        for _ in slots:
+            delays.append(await wait_random(max_delay))
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, n))))
+    return delays
@@ -6,11 +6,14 @@ wait_n = __import__('1-concurrent_coroutines').wait_n
 
 
 def measure_time(n: int, max_delay: int) -> float:
-    """ Measure elapsed time """
-    start = time.time()
+    """ Measure elapsed time
+
+    A single run; see 7-benchmark.py for repeated, statistical runs.
+    """
+    start = time.perf_counter()
 
     asyncio.run(wait_n(n, max_delay))
 
-    end = time.time()
+    end = time.perf_counter()
     total_time = end - start
     return total_time / n
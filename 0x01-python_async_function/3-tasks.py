@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 """ Creating instances of asyncio.Task """
 import asyncio
+from typing import Any, Awaitable, Callable
 wait_random = __import__('0-basic_async_syntax').wait_random
 
 
-def task_wait_random(max_delay: int) -> asyncio.Task:
+def task_wait_random(max_delay: int,
+                     sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+                     ) -> asyncio.Task:
     """ creates asyncio.Task object """
-    task = asyncio.create_task(wait_random())
+    task = asyncio.create_task(wait_random(max_delay, sleep))
     return task
@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
 """ Executing multiple coroutines """
-from typing import List
+from typing import AsyncIterator, List
 import asyncio
 task_wait_random = __import__('3-tasks').task_wait_random
 
 
-async def task_wait_n(n: int, max_delay: int) -> List[float]:
-    """ execute multiple coroutines at the same time """
+async def iter_task_wait_n(n: int,
+                           max_delay: int) -> AsyncIterator[float]:
+    """ yield each delay as soon as its task completes
 
+    Closing the generator early, e.g. with ``await iterator.aclose()``
+    after a break, cancels the tasks that are still running.
+    """
     routines = [task_wait_random(max_delay) for _ in range(n)]
+    try:
+        # as_completed method returns an iterator that yields
+        # coroutines as they are completed
+        for routine in asyncio.as_completed(routines):
+            yield await routine
+    finally:
+        for routine in routines:
+            routine.cancel()
+        await asyncio.gather(*routines, return_exceptions=True)
+
 
-    # as_completed method returns an asynchronous iterator that yields
-    # coroutines as they are completed
-    return [await routine for routine in asyncio.as_completed(routines)]
+async def task_wait_n(n: int, max_delay: int) -> List[float]:
+    """ execute multiple coroutines at the same time """
+    return [delay async for delay in iter_task_wait_n(n, max_delay)]
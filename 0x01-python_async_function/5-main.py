@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+
+virtual_clock = __import__('5-virtual_clock').virtual_clock
+wait_n = __import__('1-concurrent_coroutines').wait_n
+task_wait_n = __import__('4-tasks').task_wait_n
+measure_time = __import__('2-measure_runtime').measure_time
+
+start = time.perf_counter()
+with virtual_clock() as clock:
+    delays = asyncio.run(wait_n(10000, 600))
+    print(len(delays), max(delays), clock.elapsed)
+    asyncio.run(task_wait_n(10, 6))
+    measure_time(1000, 600)
+    print(clock.elapsed)
+print(time.perf_counter() - start)
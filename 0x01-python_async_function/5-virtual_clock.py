@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+""" Virtual-time event loop """
+import asyncio
+import selectors
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+
+class _FastForwardSelector(selectors.DefaultSelector):
+    """ selector that advances the loop's clock instead of sleeping """
+
+    def __init__(self, loop: "VirtualTimeLoop") -> None:
+        """ Init method of _FastForwardSelector """
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout: Optional[float] = None) -> List:
+        """ poll the real file descriptors, then jump to the next timer """
+        events = super().select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            # no timer is scheduled, only real I/O can wake the loop
+            return super().select(None)
+        self._loop.advance(timeout)
+        return []
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """ event loop whose clock starts at 0 and fast-forwards to the next
+    timer whenever every task is idle, so ``asyncio.sleep`` returns at
+    once while ``loop.time()`` reports the virtual elapsed time.
+
+    Real I/O still works, but timers do not wait for it: a simulation
+    should only sleep.
+    """
+
+    def __init__(self) -> None:
+        """ Init method of VirtualTimeLoop """
+        self._virtual_time = 0.0
+        super().__init__(_FastForwardSelector(self))
+
+    def time(self) -> float:
+        """ virtual seconds since the loop was created """
+        return self._virtual_time
+
+    def advance(self, seconds: float) -> None:
+        """ move the clock forward """
+        self._virtual_time += seconds
+
+
+class VirtualTimePolicy(asyncio.DefaultEventLoopPolicy):
+    """ policy making ``asyncio.run`` use virtual-time loops """
+
+    def __init__(self) -> None:
+        """ Init method of VirtualTimePolicy """
+        super().__init__()
+        self.loops: List[VirtualTimeLoop] = []
+
+    def new_event_loop(self) -> VirtualTimeLoop:
+        """ create a virtual-time loop """
+        loop = VirtualTimeLoop()
+        self.loops.append(loop)
+        return loop
+
+    @property
+    def elapsed(self) -> float:
+        """ virtual seconds spent by every loop created so far """
+        return sum(loop.time() for loop in self.loops)
+
+
+@contextmanager
+def virtual_clock() -> Iterator[VirtualTimePolicy]:
+    """ run every ``asyncio.run`` of the block in virtual time
+
+    Example
+    -------
+    >>> with virtual_clock() as clock:
+    ...     asyncio.run(wait_n(1000, 600))
+    >>> clock.elapsed
+    599.6...
+    """
+    previous = asyncio.get_event_loop_policy()
+    policy = VirtualTimePolicy()
+    asyncio.set_event_loop_policy(policy)
+    try:
+        yield policy
+    finally:
+        asyncio.set_event_loop_policy(previous)
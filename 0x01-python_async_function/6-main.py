@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+
+import asyncio
+
+TimingWheel = __import__('6-timing_wheel').TimingWheel
+wait_random = __import__('0-basic_async_syntax').wait_random
+task_wait_random = __import__('3-tasks').task_wait_random
+
+
+async def main():
+    wheel = TimingWheel(tick=0.05)
+    print(await wait_random(2, sleep=wheel.sleep))
+    print(await task_wait_random(2, sleep=wheel.sleep))
+
+asyncio.run(main())
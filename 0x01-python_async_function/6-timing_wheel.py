@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+""" Hashed timing wheel sleep """
+import asyncio
+import math
+from typing import Any, List, Optional, Tuple
+
+
+class TimingWheel:
+    """ sleep primitive backed by a hashed timing wheel
+
+    Sleepers are hashed by their due tick into ``slots`` buckets of
+    ``tick`` seconds. A single loop timer fires once per tick that has
+    sleepers and wakes all of them together, instead of one heap timer
+    per sleeper. Sleeps last at least ``delay`` and at most one tick
+    more.
+
+    Example
+    -------
+    >>> wheel = TimingWheel(tick=0.01)
+    >>> await wait_random(10, sleep=wheel.sleep)
+    """
+
+    def __init__(self, tick: float = 0.01, slots: int = 512) -> None:
+        """ Init method of TimingWheel """
+        if tick <= 0 or slots < 1:
+            raise ValueError("tick and slots must be positive")
+        self.tick = tick
+        self._slots: List[List[Tuple[int, asyncio.Future]]] = [
+            [] for _ in range(slots)]
+        self._cursor = 0
+        self._pending = 0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._armed = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __len__(self) -> int:
+        return self._pending
+
+    async def sleep(self, delay: float, result: Any = None) -> Any:
+        """ coroutine that completes after ``delay`` seconds """
+        if delay <= 0:
+            return await asyncio.sleep(0, result)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._pending:
+                raise RuntimeError("TimingWheel is in use by another loop")
+            self._loop = loop
+            self._handle = None
+        if not self._pending:
+            self._cursor = math.floor(loop.time() / self.tick)
+        due = max(math.ceil((loop.time() + delay) / self.tick),
+                  self._cursor + 1)
+        future = loop.create_future()
+        self._slots[due % len(self._slots)].append((due, future))
+        self._pending += 1
+        if self._handle is None or due < self._armed:
+            self._schedule(due)
+        await future
+        return result
+
+    def _arm(self) -> None:
+        """ schedule the loop timer at the next tick with sleepers """
+        size = len(self._slots)
+        due = self._cursor + size
+        for tick in range(self._cursor + 1, self._cursor + size + 1):
+            if self._slots[tick % size]:
+                due = tick
+                break
+        self._schedule(due)
+
+    def _schedule(self, due: int) -> None:
+        """ (re)schedule the loop timer at tick ``due`` """
+        if self._handle is not None:
+            self._handle.cancel()
+        self._armed = due
+        self._handle = self._loop.call_at(due * self.tick, self._advance)
+
+    def _advance(self) -> None:
+        """ wake every sleeper due by now, one bucket at a time """
+        # the armed tick counts as reached despite float rounding
+        now = max(math.floor(self._loop.time() / self.tick), self._armed)
+        size = len(self._slots)
+        for tick in range(self._cursor + 1,
+                          min(now, self._cursor + size) + 1):
+            bucket = self._slots[tick % size]
+            if not bucket:
+                continue
+            waiting = []
+            for entry in bucket:
+                if entry[0] > now:
+                    waiting.append(entry)
+                elif not entry[1].done():
+                    entry[1].set_result(None)
+            self._pending -= len(bucket) - len(waiting)
+            self._slots[tick % size] = waiting
+        self._cursor = now
+        self._handle = None
+        if self._pending:
+            self._arm()
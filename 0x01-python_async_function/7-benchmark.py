@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+""" Statistical benchmark harness for coroutines """
+import asyncio
+import math
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+def percentile(samples: List[int], fraction: float) -> int:
+    """ nearest-rank percentile of sorted samples """
+    rank = max(math.ceil(fraction * len(samples)), 1)
+    return samples[min(rank, len(samples)) - 1]
+
+
+def summarize(samples: List[int]) -> Dict[str, float]:
+    """ mean, median, tail percentiles and spread, in nanoseconds """
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "mean_ns": statistics.fmean(ordered),
+        "median_ns": statistics.median(ordered),
+        "p95_ns": percentile(ordered, 0.95),
+        "p99_ns": percentile(ordered, 0.99),
+        "min_ns": ordered[0],
+        "max_ns": ordered[-1],
+        "stdev_ns": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+async def _noop() -> None:
+    """ empty coroutine, to time the loop itself """
+
+
+def benchmark(make_coroutine: Callable[[], Awaitable[Any]],
+              repeat: int = 20, warmup: int = 3,
+              loop_factory: Optional[Callable[[],
+                                              asyncio.AbstractEventLoop]]
+              = None) -> Dict[str, float]:
+    """ time ``repeat`` runs of a coroutine after ``warmup`` runs
+
+    Every run reuses one event loop, created by ``loop_factory``
+    (``asyncio.new_event_loop`` by default), and is timed with
+    ``time.perf_counter_ns``. ``loop_overhead_ns`` is the median time
+    the same loop takes to run an empty coroutine.
+
+    Example
+    -------
+    >>> benchmark(lambda: wait_n(100, 0), repeat=50)
+    {'runs': 50, 'mean_ns': ..., 'median_ns': ..., 'p95_ns': ..., ...}
+    """
+    if repeat < 1:
+        raise ValueError("repeat must be at least 1")
+    loop = (loop_factory or asyncio.new_event_loop)()
+    try:
+        for _ in range(warmup):
+            loop.run_until_complete(make_coroutine())
+        overhead = []
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            loop.run_until_complete(_noop())
+            overhead.append(time.perf_counter_ns() - start)
+        samples = []
+        for _ in range(repeat):
+            coroutine = make_coroutine()
+            start = time.perf_counter_ns()
+            loop.run_until_complete(coroutine)
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        loop.close()
+    return dict(summarize(samples),
+                loop_overhead_ns=statistics.median(overhead))
+
+
+def compare(results: Dict[str, Dict[str, float]],
+            baseline: Dict[str, Dict[str, float]],
+            metrics: tuple = ("median_ns", "p95_ns", "p99_ns")
+            ) -> Dict[str, Dict[str, float]]:
+    """ ratio of each metric to the baseline, per case in both """
+    return {
+        case: {metric: results[case][metric] / baseline[case][metric]
+               for metric in metrics if baseline[case].get(metric)}
+        for case in results if case in baseline
+    }
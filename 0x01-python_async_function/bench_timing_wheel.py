@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+""" Benchmark the scheduling overhead of TimingWheel against asyncio.sleep
+
+n tasks of wait_random(max_delay) run under the virtual clock, so no
+time is spent really sleeping and the wall time is pure scheduling
+overhead. Prints the nanoseconds per task of each sleep as JSON.
+Usage: ./bench_timing_wheel.py [max_exp] [max_delay] [tick]
+"""
+import asyncio
+import gc
+import json
+import sys
+import time
+from typing import Any, Awaitable, Callable
+wait_random = __import__('0-basic_async_syntax').wait_random
+virtual_clock = __import__('5-virtual_clock').virtual_clock
+TimingWheel = __import__('6-timing_wheel').TimingWheel
+
+
+async def spawn(n: int, max_delay: float,
+                sleep: Callable[[float], Awaitable[Any]]) -> None:
+    """ run n sleeping tasks at once """
+    tasks = [asyncio.create_task(wait_random(max_delay, sleep))
+             for _ in range(n)]
+    await asyncio.gather(*tasks)
+
+
+def measure(n: int, max_delay: float,
+            sleep: Callable[[float], Awaitable[Any]]) -> float:
+    """ wall nanoseconds per task """
+    gc.collect()
+    with virtual_clock():
+        start = time.perf_counter()
+        asyncio.run(spawn(n, max_delay, sleep))
+        seconds = time.perf_counter() - start
+    return seconds / n * 1e9
+
+
+if __name__ == "__main__":
+    max_exp = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    max_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    tick = float(sys.argv[3]) if len(sys.argv) > 3 else 0.01
+    results = []
+    for exp in range(2, max_exp + 1):
+        n = 10 ** exp
+        asyncio_sleep = measure(n, max_delay, asyncio.sleep)
+        wheel = measure(n, max_delay, TimingWheel(tick).sleep)
+        results.append({
+            "n": n,
+            "asyncio_sleep_ns_per_task": asyncio_sleep,
+            "timing_wheel_ns_per_task": wheel,
+            "speedup": asyncio_sleep / wheel,
+        })
+    print(json.dumps({"max_delay": max_delay, "tick": tick,
+                      "results": results}, indent=2))
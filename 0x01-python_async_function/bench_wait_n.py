@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+""" Benchmark wait_n with and without bounded concurrency
+
+Runs wait_n for n = 10**3 up to 10**max_exp and prints, as JSON, the
+throughput of each mode and the tracemalloc peak of one more run.
+Usage: ./bench_wait_n.py [max_exp] [max_delay] [concurrency]
+"""
+import asyncio
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from typing import Dict, Optional
+wait_n = __import__('1-concurrent_coroutines').wait_n
+
+
+def measure(n: int, max_delay: float,
+            concurrency: Optional[int]) -> Dict[str, float]:
+    """ time one run, then trace the memory of another """
+    gc.collect()
+    start = time.perf_counter()
+    asyncio.run(wait_n(n, max_delay, concurrency))
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    asyncio.run(wait_n(n, max_delay, concurrency))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": seconds,
+        "coroutines_per_second": n / seconds,
+        "peak_bytes": peak,
+    }
+
+
+if __name__ == "__main__":
+    max_exp = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    max_delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    results = []
+    for exp in range(3, max_exp + 1):
+        for mode in (None, concurrency):
+            results.append(dict(measure(10 ** exp, max_delay, mode),
+                                n=10 ** exp, concurrency=mode))
+    print(json.dumps({"max_delay": max_delay, "results": results},
+                     indent=2))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+""" Compare the wait_n variants with the benchmark harness
+
+Times wait_n, task_wait_n, bounded wait_n and draining or taking the
+first result of iter_wait_n, and prints JSON keyed by case. With
+--baseline, the ratios of the medians and tail percentiles to a stored
+run are added under "diff".
+Usage: ./bench_wait_variants.py [--n 1000] [--max-delay 0.01]
+       [--repeat 20] [--warmup 3] [--concurrency 100] [--virtual]
+       [--baseline old.json] [--output new.json]
+"""
+import argparse
+import json
+import platform
+import sys
+from typing import Any, Awaitable, Callable, Dict
+harness = __import__('7-benchmark')
+wait_n = __import__('1-concurrent_coroutines').wait_n
+iter_wait_n = __import__('1-concurrent_coroutines').iter_wait_n
+task_wait_n = __import__('4-tasks').task_wait_n
+VirtualTimeLoop = __import__('5-virtual_clock').VirtualTimeLoop
+
+
+async def first_result(n: int, max_delay: float) -> float:
+    """ take the first streamed delay and cancel the rest """
+    iterator = iter_wait_n(n, max_delay)
+    try:
+        return await iterator.__anext__()
+    finally:
+        await iterator.aclose()
+
+
+async def drain(n: int, max_delay: float) -> int:
+    """ consume every streamed delay """
+    count = 0
+    async for _ in iter_wait_n(n, max_delay):
+        count += 1
+    return count
+
+
+def cases(n: int, max_delay: float,
+          concurrency: int) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    """ the variants to compare """
+    return {
+        "wait_n": lambda: wait_n(n, max_delay),
+        "task_wait_n": lambda: task_wait_n(n, max_delay),
+        "wait_n_bounded": lambda: wait_n(n, max_delay, concurrency),
+        "iter_wait_n_first": lambda: first_result(n, max_delay),
+        "iter_wait_n_drain": lambda: drain(n, max_delay),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=1000)
+    parser.add_argument("--max-delay", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--virtual", action="store_true",
+                        help="sleep in virtual time, timing overhead only")
+    parser.add_argument("--baseline", type=argparse.FileType("r"))
+    parser.add_argument("--output", type=argparse.FileType("w"),
+                        default=sys.stdout)
+    args = parser.parse_args()
+
+    loop_factory = VirtualTimeLoop if args.virtual else None
+    results = {
+        name: harness.benchmark(make_coroutine, args.repeat, args.warmup,
+                                loop_factory)
+        for name, make_coroutine in cases(args.n, args.max_delay,
+                                          args.concurrency).items()
+    }
+    report = {
+        "python": platform.python_version(),
+        "params": {key: value for key, value in vars(args).items()
+                   if key not in ("baseline", "output")},
+        "results": results,
+    }
+    if args.baseline is not None:
+        report["diff"] = harness.compare(
+            results, json.load(args.baseline)["results"])
+    json.dump(report, args.output, indent=2, sort_keys=True)
+    args.output.write("\n")
@@ -2,11 +2,13 @@
 """ This is an Async generator """
 import asyncio
 import random
-from typing import Generator
+from typing import Any, Awaitable, Callable, Generator
 
 
-async def async_generator() -> Generator[float, None, None]:
+async def async_generator(
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep
+) -> Generator[float, None, None]:
     """The asycn generator function """
     for _ in range(10):
-        await asyncio.sleep(1)
+        await sleep(1)
         yield random.uniform(0, 10)
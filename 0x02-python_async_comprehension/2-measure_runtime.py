@@ -1,18 +1,18 @@
 #!/usr/bin/env python3
 """ Measure run time """
-from time import time
+from time import perf_counter
 import asyncio
 async_comprehension = __import__('1-async_comprehension').async_comprehension
 
 
 async def measure_runtime() -> float:
     """ Runtime for 4 parallel comprehensions """
-    start = time()
+    start = perf_counter()
 
     results = [async_comprehension() for _ in range(4)]
     await asyncio.gather(*results)
 
-    end = time()
+    end = perf_counter()
     total_time = end - start
 
     return total_time
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""An asynchronous github org client
+"""
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+)
+
+import aiohttp
+
+from client import GithubOrgClient
+from utils import async_memoize, decode_json
+
+
+def make_session(limit: int = 100,
+                 limit_per_host: int = 0) -> aiohttp.ClientSession:
+    """Create a session on a bounded, keep-alive connection pool.
+    Parameters
+    ----------
+    limit: int
+        Maximum number of simultaneous connections
+    limit_per_host: int
+        Maximum number of simultaneous connections to a single host,
+        0 meaning no per-host limit
+    """
+    connector = aiohttp.TCPConnector(limit=limit,
+                                     limit_per_host=limit_per_host)
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def get_json_async(session: aiohttp.ClientSession, url: str) -> Any:
+    """Get JSON from remote URL over a shared session.
+    """
+    async with session.get(url) as response:
+        return decode_json(await response.read())
+
+
+async def get_json_pages_async(session: aiohttp.ClientSession,
+                               url: str) -> AsyncIterator[Any]:
+    """Iterate over the JSON pages of a paginated remote resource.
+    Follows the ``Link: <...>; rel="next"`` response header.
+    """
+    while url:
+        async with session.get(url) as response:
+            page = decode_json(await response.read())
+            next_link = response.links.get("next")
+        yield page
+        url = str(next_link["url"]) if next_link else None
+
+
+class AsyncGithubOrgClient:
+    """An asyncio Github org client.
+    Every client given the same session shares its connection pool, so
+    many orgs can be queried concurrently with ``asyncio.gather``.
+    Example
+    -------
+    >>> async with make_session() as session:
+    ...     client = AsyncGithubOrgClient("google", session)
+    ...     repos = await client.public_repos(license="apache-2.0")
+    """
+    ORG_URL = GithubOrgClient.ORG_URL
+
+    has_license = staticmethod(GithubOrgClient.has_license)
+
+    def __init__(self, org_name: str,
+                 session: aiohttp.ClientSession) -> None:
+        """Init method of AsyncGithubOrgClient"""
+        self._org_name = org_name
+        self._session = session
+
+    @async_memoize
+    async def org(self) -> Dict:
+        """Memoize org"""
+        return await get_json_async(self._session,
+                                    self.ORG_URL.format(org=self._org_name))
+
+    @property
+    async def _public_repos_url(self) -> str:
+        """Public repos URL"""
+        return (await self.org)["repos_url"]
+
+    @async_memoize
+    async def repos_payload(self) -> List[Dict]:
+        """Memoize repos payload"""
+        return [repo async for repo in self.iter_repos()]
+
+    async def iter_repos(self) -> AsyncIterator[Dict]:
+        """Iterate over the public repos, fetching pages lazily.
+        Serves the memoized repos payload when it is already loaded.
+        """
+        if hasattr(self, "_repos_payload"):
+            for repo in self._repos_payload:
+                yield repo
+            return
+        url = await self._public_repos_url
+        async for page in get_json_pages_async(self._session, url):
+            for repo in page:
+                yield repo
+
+    async def public_repos(self, license: str = None) -> List[str]:
+        """Public repos"""
+        return [
+            repo["name"] async for repo in self.iter_repos()
+            if license is None or self.has_license(repo, license)
+        ]
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Compare access_nested_map with compiled getters and extract_columns.
+Usage: ./bench_access_nested_map.py [n_records]
+"""
+import json
+import sys
+import timeit
+
+import fixtures
+from utils import access_nested_map, compile_path, extract_columns
+
+COLUMNS = {
+    "name": ("name",),
+    "license": ("license", "key"),
+    "owner": ("owner", "login"),
+}
+
+
+def loop_access(records):
+    """Pull every column with access_nested_map, one call per field"""
+    result = {name: [] for name in COLUMNS}
+    for record in records:
+        for name, path in COLUMNS.items():
+            try:
+                result[name].append(access_nested_map(record, path))
+            except KeyError:
+                result[name].append(None)
+    return result
+
+
+def loop_compiled(records):
+    """Pull every column with compiled getters, one call per field"""
+    getters = {name: compile_path(path) for name, path in COLUMNS.items()}
+    result = {name: [] for name in COLUMNS}
+    for record in records:
+        for name, getter in getters.items():
+            try:
+                result[name].append(getter(record))
+            except KeyError:
+                result[name].append(None)
+    return result
+
+
+def bulk_extract(records):
+    """Pull every column with extract_columns"""
+    return extract_columns(records, COLUMNS, default=None)
+
+
+if __name__ == "__main__":
+    n_records = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    template = fixtures.TEST_PAYLOAD[0][1]
+    records = [template[i % len(template)] for i in range(n_records)]
+    assert loop_access(records) == loop_compiled(records) \
+        == bulk_extract(records)
+
+    result = {"n_records": n_records}
+    for fn in (loop_access, loop_compiled, bulk_extract):
+        result[fn.__name__ + "_s"] = min(
+            timeit.repeat(lambda: fn(records), number=1, repeat=5))
+    result["speedup"] = result["loop_access_s"] / result["bulk_extract_s"]
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Benchmark the sync and async clients over N orgs.
+Usage: ./bench_async_client.py [n_orgs] [latency_ms]
+"""
+import asyncio
+import json
+import sys
+import time
+
+import fixtures
+from async_client import AsyncGithubOrgClient, make_session
+from client import GithubOrgClient
+from github_server import make_app, serve_in_thread
+
+ORG_PAYLOAD, REPOS_PAYLOAD = fixtures.TEST_PAYLOAD[0][:2]
+
+
+def bench_sync(org_url: str, n_orgs: int) -> float:
+    """Query every org one after another"""
+    start = time.perf_counter()
+    for i in range(n_orgs):
+        client = GithubOrgClient("org{}".format(i))
+        client.ORG_URL = org_url
+        client.public_repos(license="apache-2.0")
+    return time.perf_counter() - start
+
+
+async def bench_async(org_url: str, n_orgs: int) -> float:
+    """Query every org concurrently over one session"""
+    start = time.perf_counter()
+    async with make_session(limit=100) as session:
+        clients = []
+        for i in range(n_orgs):
+            client = AsyncGithubOrgClient("org{}".format(i), session)
+            client.ORG_URL = org_url
+            clients.append(client)
+        await asyncio.gather(*(client.public_repos(license="apache-2.0")
+                               for client in clients))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n_orgs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02
+    orgs = {"org{}".format(i): (ORG_PAYLOAD, REPOS_PAYLOAD)
+            for i in range(n_orgs)}
+    base_url, stop = serve_in_thread(make_app(orgs, latency=latency))
+    org_url = base_url + "/orgs/{org}"
+    result = {
+        "n_orgs": n_orgs,
+        "latency_ms": latency * 1000,
+        "sync_s": bench_sync(org_url, n_orgs),
+        "async_s": asyncio.run(bench_async(org_url, n_orgs)),
+    }
+    result["speedup"] = result["sync_s"] / result["async_s"]
+    stop.set()
+    print(json.dumps(result, indent=2))
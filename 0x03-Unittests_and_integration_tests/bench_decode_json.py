@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark the JSON decoding of large repo listings.
+Bodies of synthetic repos are decoded the ways get_json could, from a
+response without a declared charset:
+``response.json()``, ``json.loads(response.text)`` (charset detection),
+``json.loads`` on the raw bytes and ``decode_json``.
+Usage: ./bench_decode_json.py [max_repos] [repeat]
+"""
+import json
+import sys
+import time
+from typing import Callable, Dict
+
+import requests
+
+import fixtures
+import utils
+from utils import decode_json
+
+
+def make_response(body: bytes) -> requests.Response:
+    """A response carrying ``body`` and no Content-Type charset"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    return response
+
+
+def cases(body: bytes) -> Dict[str, Callable[[], object]]:
+    """The decoders to time; each gets a fresh response"""
+    return {
+        "response_json": lambda: make_response(body).json(),
+        "response_text": lambda: json.loads(make_response(body).text),
+        "json_loads_bytes": lambda: json.loads(body),
+        "decode_json": lambda: decode_json(make_response(body).content),
+    }
+
+
+def best(fn: Callable[[], object], repeat: int) -> float:
+    """Best wall time of ``repeat`` runs"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(max_repos: int, repeat: int) -> Dict:
+    """Time every decoder on bodies of 10**2 up to ``max_repos`` repos"""
+    results = []
+    n_repos = 100
+    while n_repos <= max_repos:
+        body = json.dumps(list(fixtures.synthetic_repos(n_repos))).encode()
+        for name, fn in cases(body).items():
+            seconds = best(fn, repeat)
+            results.append({
+                "case": name,
+                "n_repos": n_repos,
+                "bytes": len(body),
+                "seconds": seconds,
+                "mb_per_second": len(body) / seconds / 1e6,
+            })
+        n_repos *= 10
+    return {
+        "backend": "orjson" if utils.orjson is not None else "json",
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    max_repos = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(json.dumps(run(max_repos, repeat), indent=2))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Benchmark the overhead of the instrumentation hooks.
+Times memoize hits and get_json calls served from a fresh validation
+cache entry, the cheapest paths and so the ones where any overhead
+shows most. Each is timed without the hook dispatch, with no hook
+registered and with an Instrumentation collector, and printed as JSON.
+Usage: ./bench_instrumentation.py [number] [repeat]
+"""
+import json
+import sys
+import timeit
+from functools import wraps
+from typing import Callable, Dict, List
+
+import requests
+
+import utils
+from instrumentation import Instrumentation
+
+URL = "https://api.github.com/orgs/google"
+
+
+def reference_memoize(fn: Callable) -> property:
+    """memoize as it was before the hooks"""
+    attr_name = "_{}".format(fn.__name__)
+
+    @wraps(fn)
+    def memoized(self):
+        """"memoized wraps"""
+        if not hasattr(self, attr_name):
+            setattr(self, attr_name, fn(self))
+        return getattr(self, attr_name)
+
+    return property(memoized)
+
+
+class Memoized:
+    """One property memoized each way"""
+
+    @reference_memoize
+    def reference(self):
+        """Memoize without hooks"""
+        return 42
+
+    @utils.memoize
+    def instrumented(self):
+        """Memoize with hooks"""
+        return 42
+
+
+def warm_cache() -> None:
+    """Serve ``URL`` from the validation cache without requests"""
+    utils.configure_cache(ttl=3600)
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["ETag"] = '"v1"'
+    response._content = b'{"login": "google"}'
+    utils._cache.store(URL, response)
+
+
+def run(number: int, repeat: int) -> Dict:
+    """Time every path with and without hooks.
+    The cases are interleaved in each of the ``repeat`` rounds and the
+    best round of each is kept, so that drifts of the machine load hit
+    every case alike.
+    """
+    warm_cache()
+    obj = Memoized()
+    obj.reference, obj.instrumented
+    cases = {
+        "memoize_hit": {
+            "reference": timeit.Timer("obj.reference", globals=locals()),
+            "no_hooks": timeit.Timer("obj.instrumented", globals=locals()),
+        },
+        "get_json_cached": {
+            "reference": timeit.Timer("_load_json(URL)", globals={
+                "_load_json": utils._load_json, "URL": URL}),
+            "no_hooks": timeit.Timer("get_json(URL)", globals={
+                "get_json": utils.get_json, "URL": URL}),
+        },
+    }
+    for timers in cases.values():
+        timers["hooks"] = timers["no_hooks"]
+    instrumentation = Instrumentation()
+    seconds: Dict[str, Dict[str, List[float]]] = {
+        path: {case: [] for case in timers}
+        for path, timers in cases.items()}
+    for _ in range(repeat):
+        for path, timers in cases.items():
+            for case in ("reference", "no_hooks"):
+                seconds[path][case].append(timers[case].timeit(number))
+        utils.add_hooks(instrumentation.on_request,
+                        instrumentation.on_memoize)
+        try:
+            for path, timers in cases.items():
+                seconds[path]["hooks"].append(
+                    timers["hooks"].timeit(number))
+        finally:
+            utils.remove_hooks(instrumentation.on_request,
+                               instrumentation.on_memoize)
+
+    results = {path: {case: min(rounds) / number * 1e9
+                      for case, rounds in cases_seconds.items()}
+               for path, cases_seconds in seconds.items()}
+    for timings in results.values():
+        for case in ("no_hooks", "hooks"):
+            timings[case + "_overhead"] = \
+                timings[case] / timings["reference"] - 1
+    return {"unit": "ns/call", "number": number, "repeat": repeat,
+            "results": results}
+
+
+if __name__ == "__main__":
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(json.dumps(run(number, repeat), indent=2))
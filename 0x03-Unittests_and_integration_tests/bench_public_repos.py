@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Benchmark GithubOrgClient.public_repos over synthetic orgs.
+Orgs of 10**2 up to 10**max_exp distinct repos are generated from the
+fixtures template, and the memory of each org is reported. Each case
+reports its throughput and, from tracemalloc, its peak and the blocks
+and bytes it allocated that are still held when it returns, as JSON.
+At 10**6 repos the org alone takes about 2.3 GB.
+Usage: ./bench_public_repos.py [--max-exp 6] [--repeat 3] [--output f]
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import fixtures
+from client import GithubOrgClient
+from utils import access_nested_map
+
+LICENSE = "apache-2.0"
+
+
+def make_client(repos: List[Dict]) -> GithubOrgClient:
+    """A client whose repos payload is already memoized"""
+    client = GithubOrgClient("google")
+    client._repos_payload = repos
+    return client
+
+
+def cases(repos: List[Dict]) -> Dict[str, Callable[[], object]]:
+    """The operations to time, each over every repo of the org"""
+    warm = make_client(repos)
+    warm.public_repos(LICENSE)
+    return {
+        "public_repos": lambda: make_client(repos).public_repos(),
+        "public_repos_license_cold":
+            lambda: make_client(repos).public_repos(LICENSE),
+        "public_repos_license_warm": lambda: warm.public_repos(LICENSE),
+        "has_license": lambda: [GithubOrgClient.has_license(repo, LICENSE)
+                                for repo in repos],
+        "access_nested_map": lambda: [
+            access_nested_map(repo, ("owner", "login")) for repo in repos],
+    }
+
+
+def traced(fn: Callable[[], object]) -> Dict[str, int]:
+    """Peak traced memory of a call, and the blocks and bytes it
+    allocated that are still held when it returns
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)])
+    tracemalloc.stop()
+    del result
+    stats = snapshot.statistics("filename")
+    return {
+        "peak_bytes": peak,
+        "allocated_blocks": sum(stat.count for stat in stats),
+        "allocated_bytes": sum(stat.size for stat in stats),
+    }
+
+
+def measure(fn: Callable[[], object], n_repos: int,
+            repeat: int) -> Dict[str, float]:
+    """Best-of-``repeat`` throughput, then the memory of one more run"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return dict(traced(fn), seconds=best,
+                repos_per_second=n_repos / best if best else float("inf"))
+
+
+def run(max_exp: int, repeat: int) -> Dict:
+    """Run every case for every org size"""
+    orgs, results = [], []
+    for exp in range(2, max_exp + 1):
+        n_repos = 10 ** exp
+        repos: List[Dict] = []
+        memory = traced(
+            lambda: repos.extend(fixtures.synthetic_repos(n_repos)))
+        orgs.append({"n_repos": n_repos,
+                     "bytes": memory["allocated_bytes"],
+                     "bytes_per_repo": memory["allocated_bytes"] / n_repos})
+        for name, fn in cases(repos).items():
+            results.append(dict(measure(fn, n_repos, repeat),
+                                case=name, n_repos=n_repos))
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "repeat": repeat,
+        "orgs": orgs,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-exp", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=argparse.FileType("w"),
+                        default=sys.stdout)
+    args = parser.parse_args()
+    json.dump(run(args.max_exp, args.repeat), args.output, indent=2)
+    args.output.write("\n")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark refreshing and querying the repos of a large org in the
+SQLite repo index, with and without secondary indexes.
+Usage: ./bench_repo_index.py [n_repos] [n_changed]
+"""
+import json
+import sys
+import time
+from typing import (
+    Dict,
+    List,
+    Sequence,
+)
+
+import fixtures
+from repo_index import INDEXABLE, RepoIndex
+
+
+def make_repos(n_repos: int) -> List[Dict]:
+    """Synthetic repos with spread out stars and timestamps"""
+    return [dict(repo, stargazers_count=i % 5000, watchers_count=i % 5000,
+                 updated_at="2020-{:02d}-{:02d}T00:00:00Z".format(
+                     i % 12 + 1, i % 28 + 1))
+            for i, repo in enumerate(fixtures.synthetic_repos(n_repos))]
+
+
+def measure(repos: List[Dict], n_changed: int,
+            indexed: Sequence[str]) -> Dict[str, float]:
+    """Seconds spent building rows, replacing the org, upserting the
+    changed repos of a sync and answering a filtered query
+    """
+    index = RepoIndex(indexed=indexed)
+    begin = time.perf_counter()
+    for _ in index._rows("google", repos):
+        pass
+    rows = time.perf_counter() - begin
+
+    index.replace("google", repos)
+    begin = time.perf_counter()
+    index.replace("google", repos)
+    replace = time.perf_counter() - begin
+
+    changed = [dict(repo, stargazers_count=repo["stargazers_count"] + 1)
+               for repo in repos[:n_changed]]
+    begin = time.perf_counter()
+    index.upsert("google", changed)
+    upsert = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    index.query(org="google", language="Java", min_stars=100,
+                updated_since="2020-06-01", order_by="watchers_count",
+                descending=True)
+    query = time.perf_counter() - begin
+    index.close()
+    return {"rows_s": rows, "replace_s": replace, "upsert_s": upsert,
+            "query_s": query}
+
+
+if __name__ == "__main__":
+    n_repos = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    n_changed = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    repos = make_repos(n_repos)
+    print(json.dumps({
+        "n_repos": n_repos,
+        "n_changed": n_changed,
+        "primary_key_only": measure(repos, n_changed, ()),
+        "all_indexed": measure(repos, n_changed, INDEXABLE),
+    }, indent=2))
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Benchmark a cold start from the network against a warm start from
+the snapshot store.
+Usage: ./bench_snapshot.py [n_orgs] [n_repos] [latency_ms]
+"""
+import json
+import sys
+import tempfile
+import time
+
+import fixtures
+from client import GithubOrgClient
+from github_server import make_app, serve_in_thread
+from snapshot import SnapshotStore
+from utils import configure_cache
+
+
+def start(org_url: str, directory: str, n_orgs: int) -> float:
+    """Load every org of a freshly started worker"""
+    begin = time.perf_counter()
+    GithubOrgClient.snapshots = SnapshotStore(directory)
+    for i in range(n_orgs):
+        client = GithubOrgClient("org{}".format(i))
+        client.ORG_URL = org_url
+        client.public_repos(license="apache-2.0")
+    GithubOrgClient.snapshots.close()
+    return time.perf_counter() - begin
+
+
+if __name__ == "__main__":
+    n_orgs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    n_repos = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.02
+    repos = list(fixtures.synthetic_repos(n_repos))
+    orgs = {"org{}".format(i): (fixtures.TEST_PAYLOAD[0][0], repos)
+            for i in range(n_orgs)}
+    base_url, stop = serve_in_thread(make_app(orgs, per_page=100,
+                                              latency=latency))
+    configure_cache(max_entries=0)
+    with tempfile.TemporaryDirectory() as directory:
+        cold = start(base_url + "/orgs/{org}", directory, n_orgs)
+        warm = start(base_url + "/orgs/{org}", directory, n_orgs)
+    stop.set()
+    print(json.dumps({
+        "n_orgs": n_orgs,
+        "n_repos": n_repos,
+        "latency_ms": latency * 1000,
+        "cold_start_s": cold,
+        "warm_start_s": warm,
+        "speedup": cold / warm,
+    }, indent=2))
@@ -1,31 +1,88 @@
 #!/usr/bin/env python3
 """A github org client
 """
+import heapq
 from typing import (
+    Any,
+    Callable,
+    Hashable,
     List,
     Dict,
+    Iterator,
+    Optional,
+    Tuple,
 )
 
+from records import RepoProjection
+from registry import OrgRegistry
+from repo_index import RepoIndex
+from snapshot import SnapshotStore
 from utils import (
     get_json,
-    access_nested_map,
+    get_json_pages,
+    get_json_stream,
+    compile_path,
     memoize,
 )
 
+_license_key = compile_path(("license", "key"))
+
 
 class GithubOrgClient:
     """A Githib org client
     """
     ORG_URL = "https://api.github.com/orgs/{org}"
+    # License key under which repos without a license are indexed
+    UNLICENSED = None
+    # Set to an OrgRegistry to share payloads across every instance
+    registry: Optional[OrgRegistry] = None
+    # Set to a SnapshotStore to start from the payloads persisted on disk
+    snapshots: Optional[SnapshotStore] = None
+    # Set to a RepoIndex to answer query_repos from SQLite
+    repo_index: Optional[RepoIndex] = None
+    # Ordering of incremental syncs: "updated" or "pushed"
+    SYNC_SORT = "updated"
+    SYNC_PER_PAGE = 100
 
-    def __init__(self, org_name: str) -> None:
-        """Init method of GithubOrgClient"""
+    def __init__(self, org_name: str,
+                 projection: RepoProjection = None) -> None:
+        """Init method of GithubOrgClient
+        Parameters
+        ----------
+        org_name: str
+            The org login
+        projection: RepoProjection
+            When given, repos_payload caches compact records projected
+            from each repo instead of the raw dicts
+        """
         self._org_name = org_name
+        self._projection = projection
+
+    def _shared(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Load through the class registry when one is configured"""
+        if self.registry is None:
+            return loader()
+        return self.registry.get_or_load(key, loader)
+
+    def _snapshot(self, kind: str, fetch: Callable[[], Any]) -> Any:
+        """Load from the snapshot store when one is configured, storing
+        the payloads that had to be fetched
+        """
+        if self.snapshots is None:
+            return fetch()
+        key = "{}/{}".format(self._org_name, kind)
+        payload = self.snapshots.get(key)
+        if payload is None:
+            payload = fetch()
+            self.snapshots.put(key, payload)
+        return payload
 
     @memoize
     def org(self) -> Dict:
         """Memoize org"""
-        return get_json(self.ORG_URL.format(org=self._org_name))
+        url = self.ORG_URL.format(org=self._org_name)
+        return self._shared(
+            ("org", url), lambda: self._snapshot("org", lambda: get_json(url)))
 
     @property
     def _public_repos_url(self) -> str:
@@ -33,26 +90,294 @@ class GithubOrgClient:
         return self.org["repos_url"]
 
     @memoize
-    def repos_payload(self) -> Dict:
+    def repos_payload(self) -> List[Dict]:
         """Memoize repos payload"""
-        return get_json(self._public_repos_url)
+        def load() -> List[Dict]:
+            if self._projection is not None:
+                return list(self._projection.project(self._load_repos()))
+            return list(self._load_repos())
+
+        return self._shared(
+            ("repos", self._public_repos_url, self._projection), load)
+
+    def iter_repos(self, stream: bool = False) -> Iterator[Dict]:
+        """Iterate over the public repos, fetching pages lazily.
+        Serves the memoized repos payload when it is already loaded or
+        when a registry is configured, so that clients of the same org
+        share one download, and the snapshot when a store is configured.
+        With ``stream``, each repo is decoded and yielded while its page
+        is still downloading.
+        """
+        if hasattr(self, "_repos_payload") or self.registry is not None:
+            yield from self.repos_payload
+            return
+        yield from self._load_repos(stream)
+
+    def _load_repos(self, stream: bool = False) -> Iterator[Dict]:
+        """Iterate over the raw repos of the snapshot when a store is
+        configured, else of the network
+        """
+        if self.snapshots is not None:
+            return iter(self._snapshot(
+                "repos", lambda: list(self._fetch_repos(stream))))
+        return self._fetch_repos(stream)
+
+    def _fetch_repos(self, stream: bool = False) -> Iterator[Dict]:
+        """Iterate over the public repos fetched from the network"""
+        if stream:
+            yield from get_json_stream(self._public_repos_url)
+            return
+        for page in get_json_pages(self._public_repos_url):
+            yield from page
+
+    def revalidate(self) -> None:
+        """Refetch the org and its repos from the network, refreshing the
+        snapshot store, the registry, the repo index and the memoized
+        payloads. Repos deleted since the last fetch are dropped.
+        """
+        url = self.ORG_URL.format(org=self._org_name)
+        org = get_json(url)
+        self._org = org
+        repos = list(self._fetch_repos())
+        if self.snapshots is not None:
+            self.snapshots.put("{}/org".format(self._org_name), org)
+            self.snapshots.put("{}/repos".format(self._org_name), repos)
+        if self.registry is not None:
+            self.registry.invalidate(("org", url))
+            self.registry.invalidate(
+                ("repos", org["repos_url"], self._projection))
+        if self.repo_index is not None:
+            self.repo_index.replace(self._org_name, repos)
+        if self._projection is not None:
+            repos = list(self._projection.project(repos))
+        self._repos_payload = repos
+        self.__dict__.pop("_license_index_cache", None)
+
+    def _watermark(self) -> Optional[str]:
+        """The watermark of the last sync, from the first configured
+        store: the repo index, the snapshot store, or this instance
+        """
+        if self.repo_index is not None:
+            return self.repo_index.watermark(self._org_name)
+        if self.snapshots is not None:
+            return self.snapshots.get("{}/watermark".format(self._org_name))
+        return getattr(self, "_sync_watermark", None)
+
+    def _set_watermark(self, watermark: str) -> None:
+        """Persist the watermark of a sync"""
+        if self.repo_index is not None:
+            self.repo_index.set_watermark(self._org_name, watermark)
+        elif self.snapshots is not None:
+            self.snapshots.put("{}/watermark".format(self._org_name),
+                               watermark)
+        self._sync_watermark = watermark
+
+    def _raw_repos(self) -> Optional[List[Dict]]:
+        """The unprojected repos already loaded, None if there are none"""
+        if self.snapshots is not None:
+            return self.snapshots.get("{}/repos".format(self._org_name))
+        if self._projection is None:
+            return getattr(self, "_repos_payload", None)
+        return None
+
+    @staticmethod
+    def _merge(repos: List[Dict], changed: List[Dict]) -> List[Dict]:
+        """Replace the repos in ``changed`` by id, appending new ones.
+        ``changed`` is newest first, so its first copy of a repo wins.
+        Returns ``repos`` itself when no repo differs from its copy.
+        """
+        merged = list(repos)
+        positions = {repo["id"]: position
+                     for position, repo in enumerate(merged)}
+        modified = False
+        for repo in reversed(changed):
+            position = positions.get(repo["id"])
+            if position is None:
+                positions[repo["id"]] = len(merged)
+                merged.append(repo)
+                modified = True
+            elif merged[position] != repo:
+                merged[position] = repo
+                modified = True
+        return merged if modified else repos
+
+    def _stored_at_watermark(self, field: str, watermark: str,
+                             repos: Optional[List[Dict]]
+                             ) -> Dict[Any, Optional[Dict]]:
+        """The stored repos whose ``field`` is the watermark, by id.
+        From the loaded raw repos, or else from the repo index, which
+        only keeps the indexed columns and maps each id to None.
+        """
+        if repos is not None:
+            return {repo["id"]: repo for repo in repos
+                    if repo.get(field) == watermark}
+        if self.repo_index is not None:
+            rows = self.repo_index.query(
+                org=self._org_name, columns=("id", field),
+                **{"{}_since".format(self.SYNC_SORT): watermark})
+            return dict.fromkeys(row["id"] for row in rows
+                                 if row[field] == watermark)
+        return {}
+
+    def sync(self) -> List[Dict]:
+        """Fetch the repos changed since the last sync and merge them
+        into the snapshot, the memoized payload and the repo index.
+        Repos are requested newest first by ``SYNC_SORT`` and paging
+        stops at the first repo older than the watermark, so a refresh
+        costs one page per ``SYNC_PER_PAGE`` changed repos. Repos at the
+        watermark itself are refetched, since they may have changed in
+        the same second as the last sync, and kept only if they differ
+        from their stored copy. The first sync fetches every repo.
+        Deleted repos are only dropped by ``revalidate``. Returns the
+        changed repos, newest first; a sync without changes writes
+        nothing.
+        """
+        field = self.SYNC_SORT + "_at"
+        watermark = self._watermark()
+        url = "{}?sort={}&direction=desc&per_page={}".format(
+            self._public_repos_url, self.SYNC_SORT, self.SYNC_PER_PAGE)
+        changed: List[Dict] = []
+        for page in get_json_pages(url):
+            fresh = [repo for repo in page if watermark is None
+                     or (repo.get(field) or "") >= watermark]
+            changed.extend(fresh)
+            if len(fresh) < len(page):
+                break
+
+        repos = None if watermark is None else self._raw_repos()
+        if watermark is not None and changed:
+            stored = self._stored_at_watermark(field, watermark, repos)
+            changed = [repo for repo in changed
+                       if repo.get(field) != watermark
+                       or repo["id"] not in stored
+                       or stored[repo["id"]] not in (None, repo)]
+        if not changed:
+            return changed
+
+        if watermark is None:
+            repos = changed
+        elif repos is not None:
+            merged = self._merge(repos, changed)
+            if merged is repos:
+                return []
+            repos = merged
+        if self.snapshots is not None and repos is not None:
+            self.snapshots.put("{}/repos".format(self._org_name), repos)
+        if self.repo_index is not None:
+            if watermark is None:
+                self.repo_index.replace(self._org_name, changed)
+            else:
+                self.repo_index.upsert(self._org_name, changed)
+        if self.registry is not None:
+            self.registry.invalidate(
+                ("repos", self._public_repos_url, self._projection))
+        if repos is None:
+            # Nothing to merge into: reload the full payload when needed
+            self.__dict__.pop("_repos_payload", None)
+        elif self._projection is not None:
+            self._repos_payload = list(self._projection.project(repos))
+        else:
+            self._repos_payload = repos
+        self.__dict__.pop("_license_index_cache", None)
+        self._set_watermark(max(
+            [repo.get(field) or "" for repo in changed] + [watermark or ""]))
+        return changed
+
+    def _cached_license_index(self) -> Optional[Tuple]:
+        """The license index, unless the memoized payload changed since
+        it was built
+        """
+        cached = getattr(self, "_license_index_cache", None)
+        if cached is not None and \
+                cached[0] is getattr(self, "_repos_payload", None):
+            return cached
+        return None
+
+    @property
+    def _license_index(self) -> Tuple[List[str],
+                                      Dict[Optional[str], List[int]]]:
+        """Repo names in listing order, and the positions of the repos
+        of each license key. Built lazily from one ``iter_repos`` pass
+        that keeps the names but not the repo dicts, so streaming
+        clients stay at constant memory, and rebuilt whenever the
+        memoized payload changes.
+        """
+        cached = self._cached_license_index()
+        if cached is None:
+            names, positions = [], {}
+            for position, repo in enumerate(self.iter_repos()):
+                names.append(repo["name"])
+                positions.setdefault(self.license_key(repo),
+                                     []).append(position)
+            cached = self._license_index_cache = (
+                getattr(self, "_repos_payload", None), names, positions)
+        return cached[1], cached[2]
 
     def public_repos(self, license: str = None) -> List[str]:
-        """Public repos"""
-        json_payload = self.repos_payload
-        public_repos = [
-            repo["name"] for repo in json_payload
-            if license is None or self.has_license(repo, license)
-        ]
+        """Public repos. Once a license query has indexed the repos, the
+        unfiltered listing is served from the same index so that both
+        agree until the next ``sync`` or ``revalidate``.
+        """
+        if license is not None:
+            return self.public_repos_with_licenses(license)
+        cached = self._cached_license_index()
+        if cached is not None:
+            return list(cached[1])
+        return [repo["name"] for repo in self.iter_repos()]
 
-        return public_repos
+    def public_repos_with_licenses(self,
+                                   *license_keys: Optional[str]) -> List[str]:
+        """Public repos under any of ``license_keys``, in payload order.
+        Pass ``UNLICENSED`` to select the repos without a license.
+        """
+        names, positions = self._license_index
+        selected = [positions[key] for key in set(license_keys)
+                    if key in positions]
+        if len(selected) == 1:
+            return [names[position] for position in selected[0]]
+        return [names[position] for position in heapq.merge(*selected)]
+
+    def index_repos(self) -> int:
+        """Replace the repos of the org in ``repo_index``.
+        Projected records lack most indexed columns, so with a
+        projection the raw repos are loaded again.
+        """
+        repos = self.iter_repos() if self._projection is None \
+            else self._load_repos()
+        return self.repo_index.replace(self._org_name, repos)
+
+    def query_repos(self, **filters: Any) -> List[str]:
+        """Names of the public repos matching ``filters``, which are the
+        keyword arguments of ``RepoIndex.query``. The org is indexed on
+        the first query.
+        Example
+        -------
+        >>> GithubOrgClient.repo_index = RepoIndex()
+        >>> GithubOrgClient("google").query_repos(
+        ...     language="Python", fork=False, min_stars=100,
+        ...     updated_since="2020-01-01", order_by="watchers_count",
+        ...     descending=True)
+        """
+        assert self.repo_index is not None, "repo_index is not configured"
+        if self._org_name not in self.repo_index:
+            self.index_repos()
+        return [row["name"] for row in self.repo_index.query(
+            org=self._org_name, columns=("name",), **filters)]
+
+    @staticmethod
+    def license_key(repo: Dict[str, Dict]) -> Optional[str]:
+        """Static: license key of a repo, None when unlicensed"""
+        try:
+            return _license_key(repo)
+        except KeyError:
+            return None
 
     @staticmethod
     def has_license(repo: Dict[str, Dict], license_key: str) -> bool:
         """Static: has_license"""
         assert license_key is not None, "license_key cannot be None"
         try:
-            has_license = access_nested_map(repo, ("license", "key")) == license_key
+            has_license = _license_key(repo) == license_key
         except KeyError:
             return False
         return has_license
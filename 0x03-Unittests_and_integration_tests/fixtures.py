@@ -948,3 +948,18 @@ TEST_PAYLOAD = [
     ['dagger', 'kratu', 'traceur-compiler', 'firmata.py'],
   )
 ]
+
+
+def synthetic_repos(n, template=TEST_PAYLOAD[0][1]):
+    """Yield ``n`` repos scaled up from the fixture payload.
+    Every repo gets a unique id and name and its own owner and license
+    dicts, as a decoded API response would.
+    """
+    for i in range(n):
+        repo = template[i % len(template)]
+        license = repo["license"]
+        yield dict(repo,
+                   id=i,
+                   name="{}-{}".format(repo["name"], i),
+                   owner=dict(repo["owner"]),
+                   license=dict(license) if license else license)
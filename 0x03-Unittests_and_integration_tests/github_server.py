@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""A local stand-in for the github API, served from the fixtures.
+Usage: ./github_server.py [port] [n_repos] [latency_ms]
+"""
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+import time
+from typing import (
+    Dict,
+    List,
+    Mapping,
+    Tuple,
+)
+
+from aiohttp import web
+
+import fixtures
+
+__all__ = [
+    "default_orgs",
+    "make_app",
+    "scaled_orgs",
+    "serve_in_thread",
+]
+
+OrgPayloads = Mapping[str, Tuple[Dict, List[Dict]]]
+
+# Largest page the API serves; bigger ``per_page`` values are clamped
+MAX_PER_PAGE = 100
+
+
+def default_orgs() -> Dict[str, Tuple[Dict, List[Dict]]]:
+    """The org of every fixture, under the login of its repos' owner"""
+    orgs = {}
+    for org_payload, repos_payload, _, _ in fixtures.TEST_PAYLOAD:
+        login = repos_payload[0]["owner"]["login"]
+        orgs[login] = (org_payload, repos_payload)
+    return orgs
+
+
+def scaled_orgs(n_repos: int,
+                names: Tuple[str, ...] = ("google",)) -> OrgPayloads:
+    """Orgs of ``n_repos`` synthetic repos each"""
+    org_payload = fixtures.TEST_PAYLOAD[0][0]
+    return {name: (org_payload, list(fixtures.synthetic_repos(n_repos)))
+            for name in names}
+
+
+def make_app(orgs: OrgPayloads = None, per_page: int = 30,
+             latency: float = 0.0, rate_limit: int = None,
+             rate_window: float = 3600.0,
+             compress: bool = True) -> web.Application:
+    """Build the stand-in app.
+    Parameters
+    ----------
+    orgs: OrgPayloads
+        Org login to its org payload and repos; the fixtures by default.
+        Assigning a new entry to the mapping serves it from then on
+    per_page: int
+        Default page size of ``/orgs/{org}/repos``, overridable with the
+        ``per_page`` query parameter like the real API. Sizes are capped
+        at ``MAX_PER_PAGE``, and a page or size that is not a positive
+        integer is answered with a 422
+    latency: float
+        Seconds to wait before answering each request
+    rate_limit: int
+        Requests allowed per ``rate_window`` seconds, announced with
+        the ``X-RateLimit-*`` headers; unlimited if None
+    compress: bool
+        Gzip the bodies of clients that accept it
+    """
+    orgs = default_orgs() if orgs is None else orgs
+    bodies: Dict[Tuple, Tuple[object, bytes, str]] = {}
+    orderings: Dict[Tuple, Tuple[List[Dict], List[Dict]]] = {}
+    budget = {"remaining": rate_limit, "reset": time.time() + rate_window}
+
+    def encode(key: Tuple, payload, source) -> Tuple[bytes, str]:
+        """Serialize a payload once per ``source`` object, with its ETag"""
+        cached = bodies.get(key)
+        if cached is None or cached[0] is not source:
+            body = json.dumps(payload).encode()
+            cached = bodies[key] = source, body, '"{}"'.format(
+                hashlib.sha1(body).hexdigest())
+        return cached[1], cached[2]
+
+    def ordered(name: str, sort: str, direction: str) -> List[Dict]:
+        """The repos of an org sorted like the API, cached per ordering"""
+        source = orgs[name][1]
+        if sort is None:
+            return source
+        key = (name, sort, direction)
+        cached = orderings.get(key)
+        if cached is None or cached[0] is not source:
+            field = "full_name" if sort == "full_name" else sort + "_at"
+            cached = orderings[key] = source, sorted(
+                source, key=lambda repo: repo.get(field) or "",
+                reverse=direction == "desc")
+        return cached[1]
+
+    def rate_limit_headers() -> Dict[str, str]:
+        """Spend one request of the budget"""
+        if rate_limit is None:
+            return {}
+        now = time.time()
+        if now >= budget["reset"]:
+            budget["remaining"] = rate_limit
+            budget["reset"] = now + rate_window
+        budget["remaining"] -= 1
+        return {
+            "X-RateLimit-Limit": str(rate_limit),
+            "X-RateLimit-Remaining": str(max(budget["remaining"], 0)),
+            "X-RateLimit-Reset": str(int(budget["reset"])),
+        }
+
+    async def respond(request: web.Request, key: Tuple, payload, source,
+                      headers: Dict[str, str] = None) -> web.Response:
+        """Answer with a cached body, a 304 or a rate-limit error"""
+        if latency:
+            await asyncio.sleep(latency)
+        headers = dict(headers or {}, **rate_limit_headers())
+        if rate_limit is not None and budget["remaining"] < 0:
+            return web.json_response(
+                {"message": "API rate limit exceeded"}, status=403,
+                headers=headers)
+        body, etag = encode(key, payload, source)
+        headers["ETag"] = etag
+        if etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers=headers)
+        response = web.Response(body=body, headers=headers,
+                                content_type="application/json")
+        if compress:
+            response.enable_compression()
+        return response
+
+    async def org(request: web.Request) -> web.Response:
+        """``GET /orgs/{org}``"""
+        name = request.match_info["org"]
+        if name not in orgs:
+            raise web.HTTPNotFound()
+        repos_url = "{}/orgs/{}/repos".format(request.url.origin(), name)
+        return await respond(request, ("org", name),
+                             dict(orgs[name][0], repos_url=repos_url),
+                             orgs[name][0])
+
+    async def repos(request: web.Request) -> web.Response:
+        """``GET /orgs/{org}/repos?page=&per_page=&sort=&direction=``"""
+        name = request.match_info["org"]
+        if name not in orgs:
+            raise web.HTTPNotFound()
+        sort = request.query.get("sort")
+        if sort not in (None, "created", "updated", "pushed", "full_name"):
+            raise web.HTTPUnprocessableEntity()
+        direction = request.query.get(
+            "direction", "asc" if sort == "full_name" else "desc")
+        all_repos = ordered(name, sort, direction)
+        try:
+            size = int(request.query.get("per_page", per_page))
+            page = int(request.query.get("page", 1))
+        except ValueError:
+            raise web.HTTPUnprocessableEntity()
+        if size < 1 or page < 1:
+            raise web.HTTPUnprocessableEntity()
+        size = min(size, MAX_PER_PAGE)
+        last = max((len(all_repos) + size - 1) // size, 1)
+        links = []
+        if page < last:
+            links.append('<{}>; rel="next"'.format(
+                request.url.update_query(page=page + 1)))
+            links.append('<{}>; rel="last"'.format(
+                request.url.update_query(page=last)))
+        headers = {"Link": ", ".join(links)} if links else {}
+        start = (page - 1) * size
+        return await respond(request,
+                             ("repos", name, sort, direction, page, size),
+                             all_repos[start:start + size], orgs[name][1],
+                             headers)
+
+    app = web.Application()
+    app.router.add_get("/orgs/{org}", org)
+    app.router.add_get("/orgs/{org}/repos", repos)
+    return app
+
+
+def serve_in_thread(app: web.Application,
+                    port: int = 0) -> Tuple[str, threading.Event]:
+    """Run ``app`` on a local port in a daemon thread.
+    Returns the base URL and an event that stops the server once set.
+    """
+    started = threading.Event()
+    stop = threading.Event()
+    address = {}
+
+    def run() -> None:
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", port)
+        loop.run_until_complete(site.start())
+        address["port"] = runner.addresses[0][1]
+        started.set()
+        while not stop.is_set():
+            loop.run_until_complete(asyncio.sleep(0.05))
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return "http://127.0.0.1:{}".format(address["port"]), stop
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    n_repos = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.0
+    orgs = scaled_orgs(n_repos) if n_repos else None
+    web.run_app(make_app(orgs, latency=latency), host="127.0.0.1",
+                port=port)
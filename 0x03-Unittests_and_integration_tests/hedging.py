@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Hedged requests to cut the tail latency of the github client.
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import (
+    Callable,
+    Dict,
+    Optional,
+    TypeVar,
+)
+
+__all__ = [
+    "HedgingPolicy",
+]
+
+T = TypeVar("T")
+
+
+class HedgingPolicy:
+    """Send a duplicate of a request that is slower than usual.
+    Once ``min_samples`` latencies have been observed, a request still
+    running after the ``percentile`` of the last ``window`` latencies is
+    sent again, and whichever attempt answers first wins. Hedges are
+    capped at ``max_ratio`` of all requests.
+    """
+
+    def __init__(self, percentile: float = 0.95, max_ratio: float = 0.05,
+                 window: int = 1000, min_samples: int = 20,
+                 max_workers: int = 32) -> None:
+        """Init method of HedgingPolicy"""
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self._latencies: deque = deque(maxlen=window)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(("requests", "hedged", "hedge_wins"), 0)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a request is hedged, None while there are
+        too few samples
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(int(len(latencies) * self.percentile), len(latencies) - 1)
+        return latencies[index]
+
+    def _timed(self, fn: Callable[[], T]) -> T:
+        """Call ``fn``, recording its latency on success"""
+        start = time.monotonic()
+        result = fn()
+        with self._lock:
+            self._latencies.append(time.monotonic() - start)
+        return result
+
+    def _attempt(self, fn: Callable[[], T]) -> Future:
+        """Run ``fn`` in the pool within a copy of the caller's context,
+        so that context variables such as the request priority carry over
+        """
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, self._timed, fn)
+
+    def _may_hedge(self) -> bool:
+        """Claim a hedge within the ratio cap"""
+        with self._lock:
+            if self._stats["hedged"] + 1 > \
+                    self._stats["requests"] * self.max_ratio:
+                return False
+            self._stats["hedged"] += 1
+            return True
+
+    def run(self, fn: Callable[[], T],
+            discard: Callable[[T], None] = None) -> T:
+        """Call ``fn``, hedging it when it runs late.
+        The losing attempt is cancelled if it has not started yet,
+        otherwise its result is passed to ``discard`` once it completes.
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed(fn)
+        primary = self._attempt(fn)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._may_hedge():
+            return primary.result()
+
+        hedge = self._attempt(fn)
+        attempts = [primary, hedge]
+        done, pending = wait(attempts, return_when=FIRST_COMPLETED)
+        winner = next(iter(done))
+        if winner.exception() is not None and pending:
+            # Fall back on the other attempt rather than failing early
+            winner = next(iter(pending))
+            winner.result()
+        loser = hedge if winner is primary else primary
+        if winner is hedge:
+            with self._lock:
+                self._stats["hedge_wins"] += 1
+        if not loser.cancel() and discard is not None:
+            loser.add_done_callback(
+                lambda future: future.exception() is None
+                and discard(future.result()))
+        return winner.result()
+
+    def stats(self) -> Dict[str, float]:
+        """How often hedging fired and won, with the current delay"""
+        delay = self.hedge_delay()
+        with self._lock:
+            return dict(self._stats, hedge_delay=delay)
+
+    def close(self) -> None:
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=False)
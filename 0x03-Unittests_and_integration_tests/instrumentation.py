@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Instrumentation events and an aggregating collector for the client.
+"""
+import bisect
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    NamedTuple,
+    Optional,
+)
+from urllib.parse import urlsplit
+
+__all__ = [
+    "Histogram",
+    "Instrumentation",
+    "MemoizeEvent",
+    "RequestEvent",
+    "url_template",
+]
+
+# Path segments naming the segment that follows them
+_NAMED_SEGMENTS = {"orgs": "{org}", "users": "{user}"}
+_ID = re.compile(r"\d+")
+_SHA = re.compile(r"[0-9a-f]{40}")
+
+
+@lru_cache(maxsize=1024)
+def url_template(url: str) -> str:
+    """Group a URL with the URLs of the same endpoint.
+    Org, user, owner and repo names and numeric ids are replaced by
+    placeholders and the query string is dropped.
+    Example
+    -------
+    >>> url_template("https://api.github.com/orgs/google/repos?page=2")
+    'https://api.github.com/orgs/{org}/repos'
+    """
+    parts = urlsplit(url)
+    segments = parts.path.split("/")
+    for position, segment in enumerate(segments):
+        previous = segments[position - 1] if position else ""
+        if not segment:
+            continue
+        if previous in _NAMED_SEGMENTS:
+            segments[position] = _NAMED_SEGMENTS[previous]
+        elif segments[1:2] == ["repos"] and position in (2, 3):
+            segments[position] = ("{owner}", "{repo}")[position - 2]
+        elif _SHA.fullmatch(segment):
+            segments[position] = "{sha}"
+        elif _ID.fullmatch(segment):
+            segments[position] = "{id}"
+    origin = "{}://{}".format(parts.scheme, parts.netloc) \
+        if parts.netloc else ""
+    return origin + "/".join(segments)
+
+
+class RequestEvent(NamedTuple):
+    """One ``get_json`` call.
+    ``status`` is None when the body was served from the validation
+    cache without a request. ``connect`` is the time until the response
+    headers arrived, ``transfer`` the rest of the download and
+    ``decode`` the JSON parsing, all in seconds.
+    """
+    url: str
+    template: str
+    status: Optional[int]
+    bytes: int
+    connect: float
+    transfer: float
+    decode: float
+    total: float
+    error: Optional[str]
+
+
+class MemoizeEvent(NamedTuple):
+    """One access to a ``memoize`` property"""
+    name: str
+    hit: bool
+    seconds: float
+
+
+class Histogram:
+    """Latency histogram over log2 buckets from 1 microsecond.
+    """
+    BOUNDS = [1e-6 * 2 ** exponent for exponent in range(28)]
+
+    def __init__(self) -> None:
+        """Init method of Histogram"""
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Count one sample"""
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the ``fraction`` quantile"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for position, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if position == len(self.BOUNDS):
+                    return self.max
+                return min(self.BOUNDS[position], self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, max and percentiles, in seconds"""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class Instrumentation:
+    """Aggregate request and memoize events per endpoint and property.
+    Example
+    -------
+    >>> instrumentation = Instrumentation()
+    >>> add_hooks(instrumentation.on_request, instrumentation.on_memoize)
+    >>> GithubOrgClient("google").public_repos()
+    >>> instrumentation.stats()["requests"]
+    {'https://api.github.com/orgs/{org}': {'count': 1, ...}, ...}
+    """
+
+    def __init__(self) -> None:
+        """Init method of Instrumentation"""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop every aggregate"""
+        with self._lock:
+            self._requests: Dict[str, Dict[str, Any]] = {}
+            self._memoize: Dict[str, Dict[str, Any]] = {}
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Request hook"""
+        with self._lock:
+            endpoint = self._requests.get(event.template)
+            if endpoint is None:
+                endpoint = self._requests[event.template] = {
+                    "count": 0, "errors": 0, "bytes": 0,
+                    "statuses": Counter(),
+                    "timings": {name: Histogram() for name in
+                                ("connect", "transfer", "decode", "total")},
+                }
+            endpoint["count"] += 1
+            endpoint["errors"] += event.error is not None
+            endpoint["bytes"] += event.bytes
+            endpoint["statuses"][event.status] += 1
+            timings = endpoint["timings"]
+            timings["connect"].record(event.connect)
+            timings["transfer"].record(event.transfer)
+            timings["decode"].record(event.decode)
+            timings["total"].record(event.total)
+
+    def on_memoize(self, event: MemoizeEvent) -> None:
+        """Memoize hook"""
+        with self._lock:
+            prop = self._memoize.get(event.name)
+            if prop is None:
+                prop = self._memoize[event.name] = {
+                    "hits": 0, "misses": 0, "compute": Histogram()}
+            if event.hit:
+                prop["hits"] += 1
+            else:
+                prop["misses"] += 1
+                prop["compute"].record(event.seconds)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Counters and latency summaries of every endpoint and property.
+        Statuses are keyed by code, with ``None`` for cache hits.
+        """
+        with self._lock:
+            requests: Dict[str, Any] = {}
+            for template, endpoint in self._requests.items():
+                requests[template] = dict(
+                    endpoint, statuses=dict(endpoint["statuses"]),
+                    timings={name: histogram.summary() for name, histogram
+                             in endpoint["timings"].items()})
+            memoize = {name: dict(prop, compute=prop["compute"].summary())
+                       for name, prop in self._memoize.items()}
+        return {"requests": requests, "memoize": memoize}
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Compact slotted records for GitHub payloads.
+"""
+import keyword
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from utils import compile_path
+
+__all__ = [
+    "Record",
+    "RepoProjection",
+    "make_record_type",
+]
+
+
+class Record(Mapping):
+    """Mapping stored in ``__slots__``.
+    Records can stand in for the dicts they were projected from, so
+    ``access_nested_map`` and ``GithubOrgClient.has_license`` accept them.
+    """
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}={!r}".format(name, getattr(self, name))
+            for name in self._fields))
+
+
+# Names a field would shadow on the record type
+_RESERVED = frozenset(dir(Record))
+
+
+def make_record_type(name: str, fields: Sequence[str]) -> type:
+    """Create a ``Record`` subclass with one slot per field.
+    Its ``__init__`` takes the field values positionally and is
+    generated, like ``collections.namedtuple``, to keep construction
+    cheap. Field names must be identifiers that are neither keywords
+    nor attributes of ``Record``, such as ``get`` or ``keys``.
+    """
+    fields = tuple(fields)
+    if not fields:
+        raise ValueError("A record needs at least one field")
+    for field in fields:
+        if not field.isidentifier() or keyword.iskeyword(field) \
+                or field in _RESERVED:
+            raise ValueError("Invalid field name: {!r}".format(field))
+    source = "def __init__(self, {0}):\n    {1} = {0}\n".format(
+        ", ".join(fields), ", ".join("self." + field for field in fields))
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+    return type(name, (Record,), {"__slots__": fields, "_fields": fields,
+                                  "__init__": namespace["__init__"]})
+
+
+class RepoProjection:
+    """Project GitHub repo dicts onto compact ``Repo`` records.
+    Only the configured fields are kept. Nested objects listed in
+    ``shared`` (the owner and the license by default) are themselves
+    reduced to records and interned, so a single object is shared by
+    every repo that references it.
+    Example
+    -------
+    >>> projection = RepoProjection()
+    >>> repo = projection(fixtures.TEST_PAYLOAD[0][1][0])
+    >>> repo["name"], repo["license"]["key"], repo.owner.login
+    ('episodes.dart', 'bsd-3-clause', 'google')
+    """
+    FIELDS = {
+        "name": ("name",),
+        "license": ("license",),
+        "owner": ("owner",),
+    }
+    SHARED = {
+        "license": ("key", "name", "spdx_id"),
+        "owner": ("login", "id", "type"),
+    }
+
+    def __init__(self, fields: Mapping[str, Sequence] = None,
+                 shared: Mapping[str, Sequence[str]] = None) -> None:
+        """Init method of RepoProjection
+        Parameters
+        ----------
+        fields: Mapping[str, Sequence]
+            Record field name to key path in the repo dict; missing
+            paths project to None
+        shared: Mapping[str, Sequence[str]]
+            Field name to the keys kept from the nested object, which
+            is interned
+        """
+        fields = dict(self.FIELDS if fields is None else fields)
+        shared = dict(self.SHARED if shared is None else shared)
+        self.record_type = make_record_type("Repo", fields)
+        self._getters = [compile_path(path) for path in fields.values()]
+        self._shared = [
+            (position, make_record_type(name.capitalize(), shared[name]),
+             tuple(shared[name]), {})
+            for position, name in enumerate(fields) if name in shared
+        ]
+
+    def __call__(self, repo: Mapping) -> Record:
+        """Project a single repo"""
+        values = []
+        for getter in self._getters:
+            try:
+                values.append(getter(repo))
+            except KeyError:
+                values.append(None)
+        for position, record_type, keys, interned in self._shared:
+            values[position] = self._intern(values[position], record_type,
+                                            keys, interned)
+        return self.record_type(*values)
+
+    @staticmethod
+    def _intern(value: Optional[Mapping], record_type: type,
+                keys: Tuple[str, ...], interned: Dict) -> Optional[Record]:
+        """Get the shared record for a nested object"""
+        if not isinstance(value, Mapping):
+            return None
+        key = tuple(value.get(name) for name in keys)
+        record = interned.get(key)
+        if record is None:
+            record = interned[key] = record_type(*key)
+        return record
+
+    def project(self, repos: Iterable[Mapping]) -> Iterator[Record]:
+        """Project every repo lazily"""
+        return map(self, repos)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""A process-wide registry of fetched github payloads.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Mapping,
+    NamedTuple,
+)
+
+__all__ = [
+    "OrgRegistry",
+    "approx_size",
+]
+
+
+def approx_size(obj: Any, sample: int = 32) -> int:
+    """Approximate the memory held by a decoded JSON payload.
+    Objects shared between several containers are counted once. Lists
+    and tuples of more than ``sample`` items are sized from ``sample``
+    items spread over them, so a payload of many repos costs a small
+    fraction of its decoding. Mapping keys are counted once, since the
+    JSON decoder shares them between the objects of a payload.
+    """
+    seen = set()
+    stack = [(obj, 1.0)]
+    size = 0.0
+    while stack:
+        obj, weight = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj) * weight
+        if isinstance(obj, Mapping):
+            stack.extend((key, 1.0) for key in obj.keys())
+            stack.extend((value, weight) for value in obj.values())
+        elif isinstance(obj, (list, tuple)):
+            if len(obj) > sample:
+                step = len(obj) / sample
+                items = [obj[int(position * step)]
+                         for position in range(sample)]
+                stack.extend((item, weight * step) for item in items)
+            else:
+                stack.extend((item, weight) for item in obj)
+    return int(size)
+
+
+class _Entry(NamedTuple):
+    """A registered value with its size and expiry"""
+    value: Any
+    size: int
+    expires_at: float
+
+
+class OrgRegistry:
+    """Thread-safe LRU registry shared by every client of the process.
+    Entries are evicted once there are more than ``max_entries`` of them
+    or once their approximate total size exceeds ``max_bytes``, and
+    expire after ``ttl`` seconds. A value larger than ``max_bytes`` on
+    its own is returned to its waiters but not registered. Concurrent
+    lookups of a missing key wait for a single load.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = None,
+                 ttl: float = None) -> None:
+        """Init method of OrgRegistry"""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._loading: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._stats = dict.fromkeys(
+            ("hits", "misses", "evictions", "rejections"), 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Get the value registered for ``key``, loading it at most once
+        per TTL window across all threads.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry.expires_at:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.value
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                future = self._loading[key] = Future()
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as error:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(error)
+            raise
+        self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        """Register a loaded value and evict past the bounds"""
+        size = approx_size(value) if self.max_bytes is not None else 0
+        expires_at = (float("inf") if self.ttl is None
+                      else time.monotonic() + self.ttl)
+        with self._lock:
+            del self._loading[key]
+            self._discard(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                self._stats["rejections"] += 1
+                return
+            self._entries[key] = _Entry(value, size, expires_at)
+            self._bytes += size
+            while self._entries and (
+                    len(self._entries) > self.max_entries
+                    or (self.max_bytes is not None
+                        and self._bytes > self.max_bytes)):
+                self._discard(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _discard(self, key: Hashable) -> None:
+        """Drop an entry; needs the lock"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def invalidate(self, key: Hashable = None) -> None:
+        """Drop the entry of ``key``, or every entry"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                self._discard(key)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss, eviction and rejection counters with the current
+        footprint
+        """
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries),
+                        bytes=self._bytes)
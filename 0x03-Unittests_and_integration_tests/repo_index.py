@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""An embedded SQLite index of github repos.
+"""
+import sqlite3
+import threading
+import time
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from utils import compile_path
+
+__all__ = [
+    "RepoIndex",
+]
+
+# Column name to (SQL type, key path in the repo payload)
+COLUMNS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "id": ("INTEGER", ("id",)),
+    "name": ("TEXT", ("name",)),
+    "full_name": ("TEXT", ("full_name",)),
+    "fork": ("INTEGER", ("fork",)),
+    "archived": ("INTEGER", ("archived",)),
+    "language": ("TEXT", ("language",)),
+    "license": ("TEXT", ("license", "key")),
+    "stargazers_count": ("INTEGER", ("stargazers_count",)),
+    "watchers_count": ("INTEGER", ("watchers_count",)),
+    "forks_count": ("INTEGER", ("forks_count",)),
+    "open_issues_count": ("INTEGER", ("open_issues_count",)),
+    "created_at": ("TEXT", ("created_at",)),
+    "updated_at": ("TEXT", ("updated_at",)),
+    "pushed_at": ("TEXT", ("pushed_at",)),
+}
+
+# Columns that can get a secondary index. Each one roughly adds the cost
+# of the table itself to every write, while queries of a single org
+# already scan only its rows through the (org, id) primary key.
+INDEXABLE = ("language", "license", "stargazers_count", "watchers_count",
+             "updated_at", "pushed_at")
+
+
+class RepoIndex:
+    """Queryable SQLite index of the repos of many orgs.
+    Example
+    -------
+    >>> index = RepoIndex()
+    >>> index.upsert("google", GithubOrgClient("google").repos_payload)
+    >>> index.query(language="Python", fork=False, min_stars=100,
+    ...             updated_since="2020-01-01", order_by="watchers_count")
+    [{'org': 'google', 'name': ...}, ...]
+    """
+
+    def __init__(self, path: str = ":memory:",
+                 indexed: Sequence[str] = ()) -> None:
+        """Init method of RepoIndex
+        Parameters
+        ----------
+        path: str
+            The SQLite database, in memory by default
+        indexed: Sequence[str]
+            Columns of ``INDEXABLE`` to index, for queries across orgs
+            on a large table; the others lose their index
+        """
+        for column in indexed:
+            if column not in INDEXABLE:
+                raise ValueError("Unknown column: {!r}".format(column))
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._getters = [compile_path(key_path)
+                         for _, key_path in COLUMNS.values()]
+        columns = ", ".join("{} {}".format(name, sql_type)
+                            for name, (sql_type, _) in COLUMNS.items())
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS repos (org TEXT NOT NULL, {}, "
+                "PRIMARY KEY (org, id))".format(columns))
+            for column in INDEXABLE:
+                self._connection.execute(
+                    ("CREATE INDEX IF NOT EXISTS repos_{0} ON repos ({0})"
+                     if column in indexed
+                     else "DROP INDEX IF EXISTS repos_{0}").format(column))
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sync_state (org TEXT PRIMARY "
+                "KEY, watermark TEXT NOT NULL, synced_at REAL NOT NULL)")
+
+    def _rows(self, org: str,
+              repos: Iterable[Mapping]) -> Iterator[Tuple[Any, ...]]:
+        """One row of column values per repo, None for missing paths"""
+        getters = self._getters
+        for repo in repos:
+            row = [org]
+            for getter in getters:
+                try:
+                    row.append(getter(repo))
+                except KeyError:
+                    row.append(None)
+            yield row
+
+    def _write(self, org: str, repos: Iterable[Mapping],
+               replace: bool) -> int:
+        """Write the repos of ``org`` in one transaction"""
+        names = ", ".join(COLUMNS)
+        updates = ", ".join("{0} = excluded.{0}".format(name)
+                            for name in COLUMNS if name != "id")
+        sql = ("INSERT INTO repos (org, {}) VALUES ({}) "
+               "ON CONFLICT (org, id) DO UPDATE SET {}").format(
+                   names, ", ".join("?" * (len(COLUMNS) + 1)), updates)
+        with self._lock, self._connection:
+            if replace:
+                self._connection.execute("DELETE FROM repos WHERE org = ?",
+                                         (org,))
+            cursor = self._connection.executemany(sql,
+                                                  self._rows(org, repos))
+            return cursor.rowcount
+
+    def upsert(self, org: str, repos: Iterable[Mapping]) -> int:
+        """Insert or update the repos of ``org`` in one transaction.
+        Returns the number of repos written.
+        """
+        return self._write(org, repos, replace=False)
+
+    def replace(self, org: str, repos: Iterable[Mapping]) -> int:
+        """Replace every repo of ``org`` in one transaction"""
+        return self._write(org, repos, replace=True)
+
+    def watermark(self, org: str) -> Optional[str]:
+        """The watermark of the last sync of ``org``, None if never synced"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT watermark FROM sync_state WHERE org = ?",
+                (org,)).fetchone()
+        return row["watermark"] if row else None
+
+    def set_watermark(self, org: str, watermark: str) -> None:
+        """Record the watermark of a sync of ``org``"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO sync_state (org, watermark, synced_at) "
+                "VALUES (?, ?, ?) ON CONFLICT (org) DO UPDATE SET "
+                "watermark = excluded.watermark, "
+                "synced_at = excluded.synced_at",
+                (org, watermark, time.time()))
+
+    def __contains__(self, org: str) -> bool:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT 1 FROM repos WHERE org = ? LIMIT 1",
+                (org,)).fetchone() is not None
+
+    def query(self, org: str = None, language: str = None,
+              fork: bool = None, archived: bool = None, license: str = None,
+              min_stars: int = None, updated_since: str = None,
+              pushed_since: str = None, order_by: str = "name",
+              descending: bool = False, limit: int = None,
+              columns: Sequence[str] = ("org", "name")) -> List[Dict]:
+        """Select repos matching every given filter.
+        Parameters
+        ----------
+        updated_since, pushed_since: str
+            ISO 8601 timestamps, compared as the API formats them
+        order_by: str
+            The column to sort by
+        columns: Sequence[str]
+            The columns of each returned row
+        """
+        for column in (order_by, *columns):
+            if column != "org" and column not in COLUMNS:
+                raise ValueError("Unknown column: {!r}".format(column))
+        filters = [
+            ("org = ?", org),
+            ("language = ?", language),
+            ("fork = ?", fork),
+            ("archived = ?", archived),
+            ("license = ?", license),
+            ("stargazers_count >= ?", min_stars),
+            ("updated_at >= ?", updated_since),
+            ("pushed_at >= ?", pushed_since),
+        ]
+        clauses = [clause for clause, value in filters if value is not None]
+        params: List[Any] = [value for _, value in filters
+                             if value is not None]
+        sql = "SELECT {} FROM repos".format(", ".join(columns))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY {} {}".format(order_by,
+                                        "DESC" if descending else "ASC")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Rate-limit-aware request scheduling for the github client.
+"""
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+__all__ = [
+    "BULK",
+    "INTERACTIVE",
+    "RateLimitScheduler",
+    "request_priority",
+]
+
+INTERACTIVE = 0
+BULK = 1
+
+_priority: ContextVar[int] = ContextVar("request_priority",
+                                        default=INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run the requests issued in the block at ``priority``.
+    Example
+    -------
+    >>> with request_priority(BULK):
+    ...     GithubOrgClient("google").public_repos()
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimitScheduler:
+    """Pace requests within the budget announced by the server.
+    A token bucket refilled at ``rate`` requests per second bounds the
+    request rate. ``X-RateLimit-Remaining`` and ``X-RateLimit-Reset``
+    response headers re-spread the remaining budget evenly until the
+    reset, and an exhausted budget holds every request until then.
+    Concurrency adapts to the observed latency: it grows by one request
+    per window while latency stays under ``target_latency`` and is
+    halved otherwise. Waiting requests are served by priority, so
+    ``INTERACTIVE`` lookups overtake ``BULK`` crawls.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 10,
+                 max_concurrency: int = 16, target_latency: float = 1.0,
+                 min_concurrency: int = 1) -> None:
+        """Init method of RateLimitScheduler"""
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.target_latency = target_latency
+        self.concurrency = float(max_concurrency)
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stats = dict.fromkeys(("requests", "throttled", "rate_limited"),
+                                    0)
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill; needs the lock"""
+        self._tokens = min(self.burst, self._tokens
+                           + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _delay(self, now: float) -> Optional[float]:
+        """Seconds until a request may start, None if it has to wait for
+        another one to complete; needs the lock
+        """
+        if self._in_flight >= int(self.concurrency):
+            return None
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        self._refill(now)
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate if self.rate > 0 else None
+        return 0.0
+
+    def acquire(self, priority: int = None) -> None:
+        """Block until a request at ``priority`` may be sent"""
+        if priority is None:
+            priority = _priority.get()
+        ticket = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            throttled = False
+            while True:
+                delay = None
+                if self._waiting[0] == ticket:
+                    delay = self._delay(time.monotonic())
+                    if delay == 0.0:
+                        break
+                throttled = True
+                self._condition.wait(delay)
+            heapq.heappop(self._waiting)
+            self._tokens -= 1
+            self._in_flight += 1
+            self._stats["requests"] += 1
+            self._stats["throttled"] += throttled
+            self._condition.notify_all()
+
+    def release(self, latency: float,
+                headers: Mapping[str, str] = None) -> None:
+        """Record a completed request and its rate-limit headers"""
+        with self._condition:
+            self._in_flight -= 1
+            if latency > self.target_latency:
+                self.concurrency = max(self.min_concurrency,
+                                       self.concurrency / 2)
+            else:
+                self.concurrency = min(self.max_concurrency,
+                                       self.concurrency
+                                       + 1 / self.concurrency)
+            if headers is not None:
+                self._update_budget(headers)
+            self._condition.notify_all()
+
+    def _update_budget(self, headers: Mapping[str, str]) -> None:
+        """Follow the budget announced by the server; needs the lock"""
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset = float(headers["X-RateLimit-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+        now = time.monotonic()
+        window = max(reset - time.time(), 0.0)
+        if remaining <= 0:
+            self._blocked_until = now + window
+            self._tokens = 0.0
+            self._stats["rate_limited"] += 1
+            return
+        self._refill(now)
+        self.rate = remaining / max(window, 1.0)
+        self._tokens = min(self._tokens, remaining)
+
+    @contextmanager
+    def slot(self, priority: int = None) -> Iterator[Dict]:
+        """Hold a request slot for the block.
+        Store the response headers under ``"headers"`` in the yielded
+        dict to feed the budget back.
+        """
+        self.acquire(priority)
+        feedback: Dict = {}
+        start = time.monotonic()
+        try:
+            yield feedback
+        finally:
+            self.release(time.monotonic() - start, feedback.get("headers"))
+
+    def stats(self) -> Dict[str, float]:
+        """Request counters with the current rate and concurrency"""
+        with self._condition:
+            return dict(self._stats, rate=self.rate,
+                        concurrency=self.concurrency,
+                        in_flight=self._in_flight,
+                        waiting=len(self._waiting))
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""A persistent store of fetched github payloads for warm starts.
+"""
+import json
+import marshal
+import mmap
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no advisory locks on Windows
+    fcntl = None
+
+__all__ = [
+    "SnapshotStore",
+]
+
+
+class SnapshotStore:
+    """Append-only snapshot of payloads on local disk.
+    Payloads are serialized with ``marshal``, compressed, and appended
+    to ``payloads.bin``. ``index.json`` maps every key to the offset of
+    its latest payload. A new process only reads the index when it opens
+    the store. The data file is memory-mapped, and each payload is
+    decoded on its first ``get`` and kept until it is superseded. The
+    marshal format depends on the interpreter, so a store written by
+    another Python version opens empty.
+    Payloads older than ``max_age`` seconds are not served, so that
+    callers fetch and store fresh ones.
+    Several processes can share a store: writers hold an exclusive lock
+    on ``lock`` and merge the index on disk before rewriting it, and
+    ``compact`` bumps a generation that makes readers reload the index
+    before they map the rewritten data file.
+    Example
+    -------
+    >>> store = SnapshotStore("/var/cache/github", max_age=3600)
+    >>> store.put("google/org", {"repos_url": "..."})
+    >>> SnapshotStore("/var/cache/github").get("google/org")
+    {'repos_url': '...'}
+    """
+    DATA_FILE = "payloads.bin"
+    INDEX_FILE = "index.json"
+    LOCK_FILE = "lock"
+    FORMAT = "marshal-{}-zlib".format(marshal.version)
+
+    def __init__(self, directory: str, compression: int = 1,
+                 max_age: float = None) -> None:
+        """Init method of SnapshotStore"""
+        self.directory = directory
+        self.compression = compression
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+        self._data_path = os.path.join(directory, self.DATA_FILE)
+        self._index_path = os.path.join(directory, self.INDEX_FILE)
+        self._lock_path = os.path.join(directory, self.LOCK_FILE)
+        self._stamp = self._index_stamp()
+        self._index, self._generation = self._read_index()
+        self._decoded: Dict[str, Tuple[Tuple, Any]] = {}
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool) -> Iterator[None]:
+        """Hold the advisory lock shared between processes"""
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive
+                        else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _index_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Identify the current version of the index file"""
+        try:
+            stat = os.stat(self._index_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _read_index(self) -> Tuple[Dict[str, List], int]:
+        """Load the index and its generation, ignoring stores of another
+        format
+        """
+        try:
+            with open(self._index_path) as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return {}, 0
+        if index.get("format") != self.FORMAT:
+            return {}, 0
+        return index["entries"], index.get("generation", 0)
+
+    def _reload(self) -> None:
+        """Adopt the index on disk, dropping the mapping of a data file
+        that was compacted since; needs both locks
+        """
+        self._stamp = self._index_stamp()
+        index, generation = self._read_index()
+        if generation != self._generation and self._map is not None:
+            self._map.close()
+            self._map = None
+        self._index, self._generation = index, generation
+
+    def _write_index(self) -> None:
+        """Atomically replace the index; needs both locks"""
+        temporary = self._index_path + ".{}.tmp".format(os.getpid())
+        with open(temporary, "w") as index_file:
+            json.dump({"format": self.FORMAT, "generation": self._generation,
+                       "entries": self._index},
+                      index_file, separators=(",", ":"))
+        os.replace(temporary, self._index_path)
+        self._stamp = self._index_stamp()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def keys(self) -> Iterator[str]:
+        """The stored keys"""
+        return iter(list(self._index))
+
+    def stored_at(self, key: str) -> Optional[float]:
+        """When the payload of ``key`` was stored, as a UNIX time"""
+        entry = self._index.get(key)
+        return entry[2] if entry else None
+
+    def put(self, key: str, payload: Any) -> None:
+        """Store the payload of ``key``, superseding any previous one"""
+        blob = zlib.compress(marshal.dumps(payload), self.compression)
+        with self._lock, self._file_lock(exclusive=True):
+            self._reload()
+            with open(self._data_path, "ab") as data_file:
+                offset = data_file.tell()
+                data_file.write(blob)
+            self._index[key] = [offset, len(blob), time.time()]
+            self._write_index()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get the payload stored for ``key``, None if there is none or
+        it is older than ``max_age``. The index is reloaded whenever
+        another process rewrote it.
+        """
+        with self._lock:
+            if self._index_stamp() != self._stamp:
+                with self._file_lock(exclusive=False):
+                    self._reload()
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            if self._map is None or len(self._map) < entry[0] + entry[1]:
+                with self._file_lock(exclusive=False):
+                    self._reload()
+                    self._remap()
+                entry = self._index.get(key)
+                if entry is None or self._map is None \
+                        or len(self._map) < entry[0] + entry[1]:
+                    return None
+            offset, length, stored_at = entry
+            if self.max_age is not None and \
+                    time.time() - stored_at > self.max_age:
+                return None
+            decoded = self._decoded.get(key)
+            if decoded is not None and decoded[0] == tuple(entry):
+                return decoded[1]
+            blob = self._map[offset:offset + length]
+        payload = marshal.loads(zlib.decompress(blob))
+        with self._lock:
+            self._decoded[key] = (tuple(entry), payload)
+        return payload
+
+    def _remap(self) -> None:
+        """Map the whole data file; needs both locks"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if os.path.exists(self._data_path) and \
+                os.path.getsize(self._data_path):
+            with open(self._data_path, "rb") as data_file:
+                self._map = mmap.mmap(data_file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+
+    def compact(self) -> None:
+        """Rewrite the data file without superseded payloads"""
+        with self._lock, self._file_lock(exclusive=True):
+            self._reload()
+            self._remap()
+            if self._map is None:
+                # The data file is missing or empty: nothing can be kept
+                self._index.clear()
+            temporary = self._data_path + ".tmp"
+            with open(temporary, "wb") as data_file:
+                for entry in self._index.values():
+                    offset, length = entry[0], entry[1]
+                    entry[0] = data_file.tell()
+                    data_file.write(self._map[offset:offset + length])
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            os.replace(temporary, self._data_path)
+            self._generation += 1
+            self._write_index()
+
+    def close(self) -> None:
+        """Unmap the data file"""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+A Test module for the asynchronous client.
+"""
+import unittest
+from parameterized import parameterized_class
+import fixtures
+
+try:
+    from aiohttp.test_utils import TestServer
+    from async_client import AsyncGithubOrgClient, make_session
+    from github_server import make_app
+except ImportError:  # pragma: no cover - aiohttp is optional
+    make_app = None
+
+
+@unittest.skipIf(make_app is None, "aiohttp is not installed")
+@parameterized_class(
+    ("org_payload", "repos_payload", "expected_repos", "apache2_repos"),
+    fixtures.TEST_PAYLOAD
+)
+class TestIntegrationAsyncGithubOrgClient(unittest.IsolatedAsyncioTestCase):
+    """
+    Test the async client against a local paginated server
+    """
+
+    async def asyncSetUp(self):
+        """
+        Start the local server and the shared session
+        """
+        self.server = TestServer(make_app(
+            {"test_org": (self.org_payload, self.repos_payload)},
+            per_page=4))
+        await self.server.start_server()
+        self.session = make_session(limit=4)
+        self.client = AsyncGithubOrgClient("test_org", self.session)
+        self.client.ORG_URL = "http://{}:{}/orgs/{{org}}".format(
+            self.server.host, self.server.port)
+
+    async def asyncTearDown(self):
+        """
+        Close the session and the server
+        """
+        await self.session.close()
+        await self.server.close()
+
+    async def test_public_repos(self):
+        """
+        Every page is followed
+        """
+        self.assertEqual(await self.client.public_repos(),
+                         self.expected_repos)
+
+    async def test_public_repos_with_license(self):
+        """
+        Test with license
+        """
+        self.assertEqual(await self.client.public_repos("apache-2.0"),
+                         self.apache2_repos)
+
+    async def test_repos_payload_is_memoized(self):
+        """
+        The payload is fetched once and then reused
+        """
+        payload = await self.client.repos_payload
+        self.assertEqual(len(payload), len(self.repos_payload))
+        self.assertIs(await self.client.repos_payload, payload)
+
+
+if __name__ == "__main__":
+    unittest.main()
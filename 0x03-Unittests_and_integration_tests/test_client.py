@@ -2,10 +2,14 @@
 """
 A Test module
 """
+import json
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from parameterized import parameterized, parameterized_class
 from client import GithubOrgClient
+from snapshot import SnapshotStore
 import fixtures
 
 
@@ -73,18 +77,21 @@ class TestGithubOrgClient(unittest.TestCase):
             "repos_url": "https://api.github.com/orgs/test_org/repos"
         }
 
-        # Mock the response from GithubOrgClient.repos_payload
-        mock_repos_payload = MagicMock()
-        mock_repos_payload.return_value = [
+        # Mock the single page of repos served at the repos URL
+        repos_page = [
             {"name": "repo1", "license": {"key": "mit"}},
             {"name": "repo2", "license": {"key": "apache"}},
             {"name": "repo3", "license": {"key": "mit"}},
         ]
 
-        with patch.object(GithubOrgClient, 'repos_payload', mock_repos_payload):
+        with patch("client.get_json_pages",
+                   return_value=iter([repos_page])) as mock_pages:
             # Call the public_repos method
             repos = github_client.public_repos(license="mit")
 
+        mock_pages.assert_called_once_with(
+            "https://api.github.com/orgs/test_org/repos")
+
         # Assert that GithubOrgClient.org is called once
         mock_get_json.assert_called_once_with("https://api.github.com/orgs/test_org")
 
@@ -130,6 +137,188 @@ class TestGithubOrgClient(unittest.TestCase):
             # Assert the returned value is as expected
             self.assertEqual(result, expected_result)
 
+    @patch("client.get_json")
+    def test_iter_repos_follows_pages(self, mock_get_json):
+        """
+        iter_repos streams every page and repos_payload caches them all
+        """
+        github_client = GithubOrgClient("test_org")
+        mock_get_json.return_value = {
+            "repos_url": "https://api.github.com/orgs/test_org/repos"
+        }
+        pages = [
+            [{"name": "repo1"}, {"name": "repo2"}],
+            [{"name": "repo3"}],
+        ]
+
+        with patch("client.get_json_pages",
+                   return_value=iter(pages)) as mock_pages:
+            self.assertEqual(github_client.public_repos(),
+                             ["repo1", "repo2", "repo3"])
+            mock_pages.return_value = iter(pages)
+            self.assertEqual(len(github_client.repos_payload), 3)
+            # Once memoized, the payload is served without refetching
+            self.assertEqual(list(github_client.iter_repos()),
+                             github_client.repos_payload)
+
+        self.assertEqual(mock_pages.call_count, 2)
+
+    @patch("client.get_json")
+    def test_iter_repos_stream(self, mock_get_json):
+        """
+        Streaming hands out repos as the download progresses
+        """
+        github_client = GithubOrgClient("test_org")
+        mock_get_json.return_value = {
+            "repos_url": "https://api.github.com/orgs/test_org/repos"
+        }
+        with patch("client.get_json_stream",
+                   return_value=iter([{"name": "repo1"}])) as mock_stream:
+            repos = github_client.iter_repos(stream=True)
+            self.assertEqual(next(repos), {"name": "repo1"})
+
+        mock_stream.assert_called_once_with(
+            "https://api.github.com/orgs/test_org/repos")
+
+    @patch("client.get_json")
+    def test_license_index(self, mock_get_json):
+        """
+        License queries are answered from an index built once
+        """
+        github_client = GithubOrgClient("test_org")
+        mock_get_json.return_value = {
+            "repos_url": "https://api.github.com/orgs/test_org/repos"
+        }
+        page = [
+            {"name": "repo1", "license": {"key": "mit"}},
+            {"name": "repo2", "license": None},
+            {"name": "repo3", "license": {"key": "apache-2.0"}},
+            {"name": "repo4"},
+            {"name": "repo5", "license": {"key": "mit"}},
+        ]
+
+        with patch("client.get_json_pages",
+                   return_value=iter([page])) as mock_pages:
+            self.assertEqual(github_client.public_repos(license="mit"),
+                             ["repo1", "repo5"])
+            self.assertEqual(
+                github_client.public_repos_with_licenses("apache-2.0",
+                                                         "mit"),
+                ["repo1", "repo3", "repo5"])
+            self.assertEqual(
+                github_client.public_repos_with_licenses(
+                    GithubOrgClient.UNLICENSED),
+                ["repo2", "repo4"])
+            self.assertEqual(github_client.public_repos(license="gpl"), [])
+            self.assertEqual(github_client.public_repos(),
+                             [repo["name"] for repo in page])
+
+        mock_pages.assert_called_once()
+        # Only names and positions are kept, not the repo dicts
+        self.assertNotIn("_repos_payload", vars(github_client))
+
+        # A new payload invalidates the index
+        github_client._repos_payload = [
+            {"name": "repo6", "license": {"key": "mit"}},
+        ]
+        self.assertEqual(github_client.public_repos(license="mit"),
+                         ["repo6"])
+
+    @patch("client.get_json")
+    def test_license_index_matches_public_repos(self, mock_get_json):
+        """
+        License queries never disagree with the unfiltered listing
+        """
+        github_client = GithubOrgClient("test_org")
+        mock_get_json.return_value = {
+            "repos_url": "https://api.github.com/orgs/test_org/repos"
+        }
+        before = [{"name": "a", "license": {"key": "mit"}}]
+        after = before + [{"name": "b", "license": {"key": "mit"}}]
+
+        with patch("client.get_json_pages",
+                   side_effect=[iter([before]), iter([after])]):
+            self.assertEqual(github_client.public_repos("mit"), ["a"])
+            # The upstream list changed; both views stay consistent
+            self.assertEqual(github_client.public_repos(), ["a"])
+            self.assertEqual(github_client.public_repos("mit"), ["a"])
+            github_client.revalidate()
+            self.assertEqual(github_client.public_repos(), ["a", "b"])
+            self.assertEqual(github_client.public_repos("mit"), ["a", "b"])
+
+    @patch("client.get_json")
+    def test_sync_stops_at_watermark(self, mock_get_json):
+        """
+        A sync only pages through repos changed since the last one
+        """
+        github_client = GithubOrgClient("test_org")
+        url = "https://api.github.com/orgs/test_org/repos"
+        mock_get_json.return_value = {"repos_url": url}
+        first = [[
+            {"id": 2, "name": "repo2", "updated_at": "2020-02-01"},
+            {"id": 1, "name": "repo1", "updated_at": "2020-01-01"},
+        ]]
+        with patch("client.get_json_pages",
+                   return_value=iter(first)) as mock_pages:
+            self.assertEqual(len(github_client.sync()), 2)
+        mock_pages.assert_called_once_with(
+            url + "?sort=updated&direction=desc&per_page=100")
+
+        fetched = []
+
+        def pages(url):
+            for page in (
+                [{"id": 3, "name": "repo3", "updated_at": "2020-03-01"},
+                 {"id": 1, "name": "repo1b", "updated_at": "2020-02-15"}],
+                [{"id": 2, "name": "repo2", "updated_at": "2020-02-01"},
+                 {"id": 0, "name": "repo0", "updated_at": "2019-12-01"}],
+                [{"id": 5, "name": "repo5", "updated_at": "2019-01-01"}],
+            ):
+                fetched.append(page)
+                yield page
+
+        with patch("client.get_json_pages", side_effect=pages):
+            changed = github_client.sync()
+        self.assertEqual([repo["id"] for repo in changed], [3, 1])
+        self.assertEqual(len(fetched), 2)
+        self.assertEqual(github_client.public_repos(),
+                         ["repo2", "repo1b", "repo3"])
+        self.assertEqual(github_client._watermark(), "2020-03-01")
+
+    @patch("client.get_json")
+    def test_sync_without_changes_writes_nothing(self, mock_get_json):
+        """
+        Repos at the watermark that are already stored are not changes
+        """
+        url = "https://api.github.com/orgs/test_org/repos"
+        mock_get_json.return_value = {"repos_url": url}
+        page = [
+            {"id": 2, "name": "repo2", "updated_at": "2020-02-01"},
+            {"id": 3, "name": "repo3", "updated_at": "2020-02-01"},
+            {"id": 1, "name": "repo1", "updated_at": "2020-01-01"},
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            GithubOrgClient.snapshots = SnapshotStore(directory)
+            try:
+                with patch("client.get_json_pages",
+                           side_effect=lambda url: iter([page])):
+                    GithubOrgClient("test_org").sync()
+                    data_file = os.path.join(directory,
+                                             SnapshotStore.DATA_FILE)
+                    size = os.path.getsize(data_file)
+                    for _ in range(3):
+                        self.assertEqual(GithubOrgClient("test_org").sync(),
+                                         [])
+                    self.assertEqual(os.path.getsize(data_file), size)
+
+                    moved = dict(page[1], name="repo3b")
+                    with patch("client.get_json_pages",
+                               return_value=iter([[page[0], moved]])):
+                        changed = GithubOrgClient("test_org").sync()
+                    self.assertEqual(changed, [moved])
+            finally:
+                GithubOrgClient.snapshots = None
+
 
 @parameterized_class(
         ("org_payload", "repos_payload", "expected_repos", "apache2_repos"),
@@ -139,18 +328,20 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        # Patch requests.get to return example payloads from fixtures
-        cls.get_patcher = patch("requests.get")
+        # Patch the pooled session's get to serve the fixture payloads
+        cls.get_patcher = patch("requests.Session.get")
         cls.mock_get = cls.get_patcher.start()
 
         # Configure the side_effect of mock_get to return the correct fixtures
-        cls.mock_get.side_effect = [
-            cls.org_payload,
-            cls.repos_payload,
-            cls.repos_payload,
-            cls.repos_payload,
-            cls.repos_payload,
-        ]
+        def get_payload(url):
+            """Build a single-page response for the requested URL"""
+            org_url = GithubOrgClient.ORG_URL.format(org="test_org")
+            payload = (cls.org_payload if url == org_url
+                       else cls.repos_payload)
+            return MagicMock(content=json.dumps(payload).encode(),
+                             links={})
+
+        cls.mock_get.side_effect = get_payload
 
     @classmethod
     def tearDownClass(cls):
@@ -161,8 +352,8 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
         # Create an instance of GithubOrgClient with a dummy org_name
         github_client = GithubOrgClient("test_org")
 
-        # Call the public_repos method with license="mit"
-        repos = github_client.public_repos(license="mit")
+        # Call the public_repos method without a license filter
+        repos = github_client.public_repos()
 
         # Assert the list of repos is what we expect from the chosen payload
         self.assertEqual(repos, self.expected_repos)
@@ -192,18 +383,20 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
         """
         Setup class
         """
-        # Patch requests.get to return example payloads from fixtures
-        cls.get_patcher = patch("requests.get")
+        # Patch the pooled session's get to serve the fixture payloads
+        cls.get_patcher = patch("requests.Session.get")
         cls.mock_get = cls.get_patcher.start()
 
         # Configure the side_effect of mock_get to return the correct fixtures
-        cls.mock_get.side_effect = [
-            cls.org_payload,
-            cls.repos_payload,
-            cls.repos_payload,
-            cls.repos_payload,
-            cls.repos_payload,
-        ]
+        def get_payload(url):
+            """Build a single-page response for the requested URL"""
+            org_url = GithubOrgClient.ORG_URL.format(org="test_org")
+            payload = (cls.org_payload if url == org_url
+                       else cls.repos_payload)
+            return MagicMock(content=json.dumps(payload).encode(),
+                             links={})
+
+        cls.mock_get.side_effect = get_payload
 
     @classmethod
     def tearDownClass(cls):
@@ -220,8 +413,8 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
         # Create an instance of GithubOrgClient with a dummy org_name
         github_client = GithubOrgClient("test_org")
 
-        # Call the public_repos method with license="mit"
-        repos = github_client.public_repos(license="mit")
+        # Call the public_repos method without a license filter
+        repos = github_client.public_repos()
 
         # Assert the list of repos is what we expect from the chosen payload
         self.assertEqual(repos, self.expected_repos)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+A Test module for the local github API stand-in.
+"""
+import unittest
+
+from parameterized import parameterized
+
+import fixtures
+from client import GithubOrgClient
+from repo_index import RepoIndex
+from utils import cache_stats, configure_cache, get_session
+
+try:
+    from github_server import make_app, serve_in_thread
+except ImportError:  # pragma: no cover - aiohttp is optional
+    make_app = None
+
+
+@unittest.skipIf(make_app is None, "aiohttp is not installed")
+class TestGithubServer(unittest.TestCase):
+    """
+    Exercise the sync client over real HTTP against the stand-in
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Serve the fixtures four repos per page
+        """
+        cls.base_url, cls.stop = serve_in_thread(
+            make_app(per_page=4, rate_limit=1000))
+        cls.org_url = cls.base_url + "/orgs/{org}"
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Stop the server
+        """
+        cls.stop.set()
+
+    def setUp(self):
+        """
+        Start from an empty validation cache
+        """
+        configure_cache()
+
+    def client(self):
+        """
+        A client of the fixtures org pointed at the stand-in
+        """
+        github_client = GithubOrgClient("google")
+        github_client.ORG_URL = self.org_url
+        return github_client
+
+    def test_pagination(self):
+        """
+        Every page is followed
+        """
+        _, _, expected_repos, apache2_repos = fixtures.TEST_PAYLOAD[0]
+        self.assertEqual(self.client().public_repos(), expected_repos)
+        self.assertEqual(self.client().public_repos("apache-2.0"),
+                         apache2_repos)
+
+    def test_etag_revalidation(self):
+        """
+        Unchanged pages are answered with 304 Not Modified
+        """
+        self.client().public_repos()
+        self.client().public_repos()
+        stats = cache_stats()
+        self.assertEqual(stats["misses"], 4)
+        self.assertEqual(stats["revalidations"], 4)
+
+    def test_headers(self):
+        """
+        Bodies are gzipped and carry the rate-limit budget
+        """
+        response = get_session().get(self.base_url + "/orgs/google",
+                                     headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.headers["X-RateLimit-Limit"], "1000")
+        self.assertIn("X-RateLimit-Remaining", response.headers)
+        self.assertEqual(response.json()["repos_url"],
+                         self.base_url + "/orgs/google/repos")
+
+    @parameterized.expand([
+        ("per_page=0",),
+        ("per_page=-1",),
+        ("per_page=many",),
+        ("page=0",),
+        ("page=-2",),
+    ])
+    def test_invalid_pagination(self, query):
+        """
+        Pages and page sizes that are not positive integers are rejected
+        """
+        response = get_session().get(
+            self.base_url + "/orgs/google/repos?" + query)
+        self.assertEqual(response.status_code, 422)
+
+    def test_page_size_is_capped(self):
+        """
+        Pages hold at most 100 repos, like the real API
+        """
+        repos = list(fixtures.synthetic_repos(150))
+        base_url, stop = serve_in_thread(make_app(
+            {"google": (fixtures.TEST_PAYLOAD[0][0], repos)}))
+        try:
+            response = get_session().get(
+                base_url + "/orgs/google/repos?per_page=1000")
+            self.assertEqual(len(response.json()), 100)
+            self.assertIn('rel="next"', response.headers["Link"])
+        finally:
+            stop.set()
+
+    def test_incremental_sync(self):
+        """
+        A sync of a big org fetches only the pages of changed repos
+        """
+        repos = list(fixtures.synthetic_repos(500))
+        for repo in repos:
+            repo["updated_at"] = "2020-01-01T00:00:{:02d}Z".format(
+                repo["id"] % 60)
+        orgs = {"google": (fixtures.TEST_PAYLOAD[0][0], repos)}
+        base_url, stop = serve_in_thread(make_app(orgs))
+        index = RepoIndex()
+        GithubOrgClient.repo_index = index
+        try:
+            github_client = GithubOrgClient("google")
+            github_client.ORG_URL = base_url + "/orgs/{org}"
+            self.assertEqual(len(github_client.sync()), 500)
+            self.assertEqual(cache_stats()["misses"], 6)
+
+            updated = [dict(repo) for repo in repos]
+            updated[7]["name"] = "renamed"
+            updated[7]["updated_at"] = "2021-01-01T00:00:00Z"
+            orgs["google"] = (orgs["google"][0], updated)
+            changed = github_client.sync()
+            self.assertEqual(cache_stats()["misses"], 7)
+            self.assertEqual(index.watermark("google"),
+                             "2021-01-01T00:00:00Z")
+            self.assertEqual(
+                index.query(org="google", updated_since="2021-01-01"),
+                [{"org": "google", "name": "renamed"}])
+        finally:
+            GithubOrgClient.repo_index = None
+            index.close()
+            stop.set()
+        self.assertEqual(changed[0]["name"], "renamed")
+        self.assertIn("renamed", github_client.public_repos())
+        self.assertEqual(len(github_client.public_repos()), 500)
+
+    def test_rate_limit_exceeded(self):
+        """
+        Requests over the budget are refused
+        """
+        base_url, stop = serve_in_thread(make_app(rate_limit=1))
+        try:
+            first = get_session().get(base_url + "/orgs/google")
+            second = get_session().get(base_url + "/orgs/google")
+        finally:
+            stop.set()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 403)
+        self.assertEqual(second.headers["X-RateLimit-Remaining"], "0")
+
+
+if __name__ == "__main__":
+    unittest.main()
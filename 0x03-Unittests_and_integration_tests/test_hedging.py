@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+A Test module for hedged requests.
+"""
+import itertools
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import scheduler
+from hedging import HedgingPolicy
+from scheduler import BULK, RateLimitScheduler, request_priority
+from utils import (
+    configure_cache,
+    configure_hedging,
+    configure_scheduler,
+    get_json,
+)
+
+
+class TestHedgingPolicy(unittest.TestCase):
+    """
+    Test when hedges fire and which attempt wins
+    """
+
+    def setUp(self):
+        """
+        A policy primed with 20 fast requests
+        """
+        self.policy = HedgingPolicy(percentile=0.9, max_ratio=0.5,
+                                    min_samples=20)
+        for _ in range(20):
+            self.policy.run(lambda: time.sleep(0.001))
+
+    def tearDown(self):
+        """
+        Stop the policy workers
+        """
+        self.policy.close()
+
+    @staticmethod
+    def slow_then_fast():
+        """
+        A call whose first attempt stalls and whose duplicate is fast
+        """
+        calls = itertools.count()
+        lock = threading.Lock()
+
+        def call():
+            with lock:
+                attempt = next(calls)
+            time.sleep(0.5 if attempt == 0 else 0.001)
+            return attempt
+
+        return call
+
+    def test_no_hedge_without_samples(self):
+        """
+        Nothing is hedged before enough latencies are known
+        """
+        policy = HedgingPolicy()
+        self.assertIsNone(policy.hedge_delay())
+        self.assertEqual(policy.run(self.slow_then_fast()), 0)
+        self.assertEqual(policy.stats()["hedged"], 0)
+        policy.close()
+
+    def test_hedge_wins(self):
+        """
+        A stalled request is duplicated and the duplicate answers first
+        """
+        discarded = []
+        start = time.monotonic()
+        result = self.policy.run(self.slow_then_fast(),
+                                 discard=discarded.append)
+
+        self.assertEqual(result, 1)
+        self.assertLess(time.monotonic() - start, 0.4)
+        stats = self.policy.stats()
+        self.assertEqual((stats["hedged"], stats["hedge_wins"]), (1, 1))
+        time.sleep(0.6)
+        self.assertEqual(discarded, [0])
+
+    def test_hedges_are_capped(self):
+        """
+        Hedges stay within the configured fraction of the traffic
+        """
+        self.policy.max_ratio = 0.01
+        self.assertEqual(self.policy.run(self.slow_then_fast()), 0)
+        self.assertEqual(self.policy.stats()["hedged"], 0)
+
+    @patch('requests.Session.get')
+    def test_get_json_is_hedged(self, mock_get):
+        """
+        get_json goes through the configured policy
+        """
+        mock_get.return_value = MagicMock(content=b'{"payload": true}')
+        configure_hedging(self.policy)
+        configure_cache(max_entries=0)
+        try:
+            self.assertEqual(get_json("http://example.com"),
+                             {"payload": True})
+        finally:
+            configure_hedging(None)
+            configure_cache()
+        self.assertEqual(self.policy.stats()["requests"], 21)
+
+    @patch('requests.Session.get')
+    def test_priority_survives_hedging(self, mock_get):
+        """
+        Attempts run on pool threads with the caller's request priority
+        """
+        mock_get.return_value = MagicMock(content=b'{"payload": true}')
+        rate_limiter = RateLimitScheduler(rate=1000, burst=100)
+        priorities = []
+        acquire = rate_limiter.acquire
+
+        def record(priority=None):
+            """ Note the priority seen by the scheduler """
+            priorities.append(scheduler._priority.get())
+            acquire(priority)
+
+        rate_limiter.acquire = record
+        configure_scheduler(rate_limiter)
+        configure_hedging(self.policy)
+        configure_cache(max_entries=0)
+        try:
+            with request_priority(BULK):
+                get_json("http://example.com")
+        finally:
+            configure_scheduler(None)
+            configure_hedging(None)
+            configure_cache()
+        self.assertEqual(priorities, [BULK])
+
+    def test_unhedged_requests_run_inline(self):
+        """
+        Without enough samples the call stays on the calling thread
+        """
+        policy = HedgingPolicy()
+        self.assertIs(policy.run(threading.current_thread),
+                      threading.current_thread())
+        policy.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+A Test module for the instrumentation hooks.
+"""
+import unittest
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from parameterized import parameterized
+
+from instrumentation import Histogram, Instrumentation, url_template
+from utils import add_hooks, configure_cache, get_json, memoize, remove_hooks
+
+
+class TestUrlTemplate(unittest.TestCase):
+    """
+    Test the endpoint grouping heuristic
+    """
+
+    @parameterized.expand([
+        ("https://api.github.com/orgs/google",
+         "https://api.github.com/orgs/{org}"),
+        ("https://api.github.com/orgs/abc/repos?page=3&per_page=100",
+         "https://api.github.com/orgs/{org}/repos"),
+        ("https://api.github.com/repos/google/dagger/issues/42",
+         "https://api.github.com/repos/{owner}/{repo}/issues/{id}"),
+        ("https://api.github.com/users/octocat",
+         "https://api.github.com/users/{user}"),
+        ("/repos/a/b/commits/" + "0123456789" * 4,
+         "/repos/{owner}/{repo}/commits/{sha}"),
+        ("https://api.github.com", "https://api.github.com"),
+    ])
+    def test_url_template(self, url, expected):
+        """
+        Names, ids and the query string are folded away
+        """
+        self.assertEqual(url_template(url), expected)
+
+
+class TestHistogram(unittest.TestCase):
+    """
+    Test the latency histogram
+    """
+
+    def test_percentiles(self):
+        """
+        Percentiles are bucket bounds, capped by the maximum
+        """
+        histogram = Histogram()
+        for _ in range(99):
+            histogram.record(0.001)
+        histogram.record(0.5)
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertLess(summary["p50"], 0.0011 * 2)
+        self.assertGreaterEqual(summary["p50"], 0.001)
+        self.assertEqual(summary["p99"], summary["p50"])
+        self.assertEqual(histogram.percentile(1.0), 0.5)
+        self.assertEqual(Histogram().summary()["p95"], 0.0)
+
+
+class TestHooks(unittest.TestCase):
+    """
+    Test the hooks of get_json and memoize
+    """
+
+    def setUp(self):
+        """
+        Register a collector on a fresh cache
+        """
+        configure_cache(ttl=60)
+        self.instrumentation = Instrumentation()
+        add_hooks(self.instrumentation.on_request,
+                  self.instrumentation.on_memoize)
+
+    def tearDown(self):
+        """
+        Unregister the collector
+        """
+        remove_hooks(self.instrumentation.on_request,
+                     self.instrumentation.on_memoize)
+        configure_cache()
+
+    @patch('requests.Session.get')
+    def test_request_events(self, mock_get):
+        """
+        Requests are aggregated per endpoint
+        """
+        mock_get.return_value = MagicMock(
+            status_code=200, headers={"ETag": '"v1"'}, links={},
+            content=b'{"v": 1}', elapsed=timedelta(milliseconds=5))
+        for org in ("google", "abc", "google"):
+            get_json("https://api.github.com/orgs/" + org)
+
+        endpoint = self.instrumentation.stats()["requests"][
+            "https://api.github.com/orgs/{org}"]
+        self.assertEqual(endpoint["count"], 3)
+        self.assertEqual(endpoint["statuses"], {200: 2, None: 1})
+        self.assertEqual(endpoint["bytes"], 16)
+        self.assertEqual(endpoint["errors"], 0)
+        self.assertEqual(endpoint["timings"]["connect"]["max"], 0.005)
+        self.assertEqual(endpoint["timings"]["total"]["count"], 3)
+
+    @patch('requests.Session.get', side_effect=ValueError)
+    def test_request_errors(self, mock_get):
+        """
+        Failed requests are reported before the error propagates
+        """
+        with self.assertRaises(ValueError):
+            get_json("https://api.github.com/orgs/google")
+        endpoint = self.instrumentation.stats()["requests"][
+            "https://api.github.com/orgs/{org}"]
+        self.assertEqual(endpoint["errors"], 1)
+
+    def test_memoize_events(self):
+        """
+        Memoize hits and misses are counted per property
+        """
+        class TestClass:
+            """ A class with a memoized property """
+
+            @memoize
+            def a_property(self):
+                """ The memoized property """
+                return 42
+
+        test_object = TestClass()
+        for _ in range(3):
+            self.assertEqual(test_object.a_property, 42)
+
+        prop = self.instrumentation.stats()["memoize"][
+            "TestHooks.test_memoize_events.<locals>.TestClass.a_property"]
+        self.assertEqual((prop["hits"], prop["misses"]), (2, 1))
+        self.assertEqual(prop["compute"]["count"], 1)
+
+    def test_remove_hooks(self):
+        """
+        Removed hooks see no more events
+        """
+        remove_hooks(self.instrumentation.on_request,
+                     self.instrumentation.on_memoize)
+
+        class TestClass:
+            """ A class with a memoized property """
+
+            @memoize
+            def a_property(self):
+                """ The memoized property """
+                return 42
+
+        TestClass().a_property
+        self.assertEqual(self.instrumentation.stats()["memoize"], {})
+
+    def test_hooks_added_later(self):
+        """
+        Properties of existing classes report once hooks are added
+        """
+        remove_hooks(on_memoize=self.instrumentation.on_memoize)
+
+        class TestClass:
+            """ A class with a memoized property """
+
+            @memoize
+            def a_property(self):
+                """ The memoized property """
+                return 42
+
+        test_object = TestClass()
+        test_object.a_property
+        add_hooks(on_memoize=self.instrumentation.on_memoize)
+        test_object.a_property
+        TestClass().a_property
+
+        prop = self.instrumentation.stats()["memoize"][
+            "TestHooks.test_hooks_added_later.<locals>.TestClass.a_property"]
+        self.assertEqual((prop["hits"], prop["misses"]), (1, 1))
+        self.assertEqual(TestClass.a_property.__doc__,
+                         " The memoized property ")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+A Test module for the compact repo records.
+"""
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+import fixtures
+from client import GithubOrgClient
+from records import RepoProjection, make_record_type
+from utils import access_nested_map
+
+
+class TestRepoProjection(unittest.TestCase):
+    """
+    Test the projection of repo dicts onto slotted records
+    """
+
+    def test_projection(self):
+        """
+        Only the configured fields are kept
+        """
+        repo = fixtures.TEST_PAYLOAD[0][1][0]
+        record = RepoProjection({"name": ["name"],
+                                 "stars": ["stargazers_count"],
+                                 "missing": ["a", "b"]}, shared={})(repo)
+
+        self.assertEqual(dict(record), {"name": "episodes.dart",
+                                        "stars": repo["stargazers_count"],
+                                        "missing": None})
+        self.assertFalse(hasattr(record, "__dict__"))
+        with self.assertRaises(KeyError):
+            record["id"]
+
+    def test_shared_objects_are_interned(self):
+        """
+        Repos of the same owner share one owner record
+        """
+        projection = RepoProjection()
+        first, second = projection.project(fixtures.synthetic_repos(2))
+
+        self.assertIs(first.owner, second.owner)
+        self.assertEqual(first.owner.login, "google")
+        self.assertEqual(access_nested_map(first, ("license", "key")),
+                         fixtures.TEST_PAYLOAD[0][1][0]["license"]["key"])
+
+    @parameterized.expand([
+        ("license.key",),
+        ("class",),
+        ("get",),
+        ("keys",),
+        ("items",),
+        ("_fields",),
+    ])
+    def test_invalid_fields(self, field):
+        """
+        Field names must be identifiers that do not shadow the record
+        """
+        with self.assertRaises(ValueError):
+            make_record_type("Repo", ["name", field])
+
+    @patch("client.get_json")
+    def test_client_with_projection(self, mock_get_json):
+        """
+        License queries work the same on projected records
+        """
+        org_payload, repos_payload, expected_repos, apache2_repos = \
+            fixtures.TEST_PAYLOAD[0]
+        mock_get_json.return_value = org_payload
+        github_client = GithubOrgClient("google", RepoProjection())
+
+        with patch("client.get_json_pages",
+                   return_value=iter([repos_payload])):
+            payload = github_client.repos_payload
+
+        self.assertEqual(type(payload[0]).__name__, "Repo")
+        self.assertEqual(github_client.public_repos(), expected_repos)
+        self.assertEqual(github_client.public_repos("apache-2.0"),
+                         apache2_repos)
+
+    def test_memory(self):
+        """
+        Records take an order of magnitude less memory than the dicts
+        """
+        def traced_per_repo(build, n):
+            tracemalloc.start()
+            try:
+                kept = build(n)
+                size = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            self.assertEqual(len(kept), n)
+            return size / n
+
+        raw = traced_per_repo(
+            lambda n: list(fixtures.synthetic_repos(n)), 2000)
+        projection = RepoProjection()
+        compact = traced_per_repo(
+            lambda n: list(projection.project(fixtures.synthetic_repos(n))),
+            100000)
+
+        self.assertLess(compact * 10, raw)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+A Test module for the process-wide org registry.
+"""
+import json
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import fixtures
+from client import GithubOrgClient
+from registry import OrgRegistry, approx_size
+
+
+class TestOrgRegistry(unittest.TestCase):
+    """
+    Test the bounds and the load deduplication of the registry
+    """
+
+    def test_lru_by_count(self):
+        """
+        The least recently used entry is evicted first
+        """
+        registry = OrgRegistry(max_entries=2)
+        for key in ("a", "b", "a", "c"):
+            registry.get_or_load(key, lambda: key)
+
+        self.assertEqual(registry.stats()["evictions"], 1)
+        self.assertEqual(registry.get_or_load("a", lambda: "reloaded"), "a")
+        self.assertEqual(registry.get_or_load("b", lambda: "reloaded"),
+                         "reloaded")
+
+    def test_lru_by_size(self):
+        """
+        Entries are evicted once the byte budget is exceeded
+        """
+        value = ["x" * 1000]
+        registry = OrgRegistry(max_bytes=int(approx_size(value) * 1.5))
+        registry.get_or_load("a", lambda: value)
+        registry.get_or_load("b", lambda: list(value))
+
+        self.assertEqual(len(registry), 1)
+        self.assertLessEqual(registry.stats()["bytes"], registry.max_bytes)
+
+    def test_oversize_value_is_not_registered(self):
+        """
+        A value larger than the byte budget is returned but not kept
+        """
+        registry = OrgRegistry(max_bytes=1000)
+        registry.get_or_load("a", lambda: "a")
+        value = registry.get_or_load("b", lambda: ["x" * 2000])
+
+        self.assertEqual(value, ["x" * 2000])
+        self.assertEqual(len(registry), 1)
+        self.assertEqual(registry.stats()["rejections"], 1)
+        self.assertEqual(registry.stats()["evictions"], 0)
+
+    def test_approx_size_samples_long_lists(self):
+        """
+        Sizing a sample of a decoded payload stays close to a full walk
+        """
+        repos = json.loads(json.dumps(list(fixtures.synthetic_repos(2000))))
+        full = approx_size(repos, sample=len(repos))
+        self.assertAlmostEqual(approx_size(repos) / full, 1, delta=0.1)
+
+    def test_ttl(self):
+        """
+        Entries are reloaded once expired
+        """
+        registry = OrgRegistry(ttl=60)
+        registry.get_or_load("a", lambda: 1)
+        with patch("registry.time.monotonic",
+                   return_value=time.monotonic() + 61):
+            self.assertEqual(registry.get_or_load("a", lambda: 2), 2)
+
+    def test_single_flight(self):
+        """
+        Concurrent lookups of a missing key share one load
+        """
+        registry = OrgRegistry()
+        calls = []
+
+        def load():
+            calls.append(1)
+            time.sleep(0.05)
+            return "payload"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    registry.get_or_load("a", load)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["payload"] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_failures_are_not_registered(self):
+        """
+        A failed load is retried on the next lookup
+        """
+        registry = OrgRegistry()
+
+        def fail():
+            raise KeyError("a")
+
+        with self.assertRaises(KeyError):
+            registry.get_or_load("a", fail)
+        self.assertEqual(registry.get_or_load("a", lambda: 1), 1)
+
+
+class TestSharedGithubOrgClient(unittest.TestCase):
+    """
+    Test clients sharing their payloads through the registry
+    """
+
+    def setUp(self):
+        """
+        Install a fresh registry
+        """
+        GithubOrgClient.registry = OrgRegistry()
+
+    def tearDown(self):
+        """
+        Remove the registry
+        """
+        GithubOrgClient.registry = None
+
+    @patch("client.get_json")
+    def test_payloads_are_shared(self, mock_get_json):
+        """
+        Fresh clients of the same org reuse the fetched payloads
+        """
+        mock_get_json.return_value = {
+            "repos_url": "https://api.github.com/orgs/test_org/repos"
+        }
+        page = [{"name": "repo1", "license": {"key": "mit"}}]
+
+        with patch("client.get_json_pages",
+                   return_value=iter([page])) as mock_pages:
+            for _ in range(3):
+                self.assertEqual(
+                    GithubOrgClient("test_org").repos_payload, page)
+
+        mock_get_json.assert_called_once()
+        mock_pages.assert_called_once()
+
+    @patch("client.get_json")
+    def test_public_repos_are_shared(self, mock_get_json):
+        """
+        Per-request clients fetch the repo pages once
+        """
+        mock_get_json.return_value = {
+            "repos_url": "https://api.github.com/orgs/test_org/repos"
+        }
+        page = [{"name": "repo1", "license": {"key": "mit"}},
+                {"name": "repo2", "license": None}]
+
+        with patch("client.get_json_pages",
+                   return_value=iter([page])) as mock_pages:
+            self.assertEqual(GithubOrgClient("test_org").public_repos(),
+                             ["repo1", "repo2"])
+            self.assertEqual(GithubOrgClient("test_org").public_repos(),
+                             ["repo1", "repo2"])
+            self.assertEqual(
+                GithubOrgClient("test_org").public_repos(license="mit"),
+                ["repo1"])
+
+        mock_pages.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+A Test module for the SQLite repo index.
+"""
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import fixtures
+from client import GithubOrgClient
+from records import RepoProjection
+from repo_index import RepoIndex
+
+
+def repo(id, name, language="Python", stars=0, fork=False,
+         updated_at="2020-01-01T00:00:00Z", license="mit"):
+    """
+    A minimal repo payload
+    """
+    return {"id": id, "name": name, "language": language, "fork": fork,
+            "stargazers_count": stars, "watchers_count": stars,
+            "updated_at": updated_at,
+            "license": {"key": license} if license else None}
+
+
+class TestRepoIndex(unittest.TestCase):
+    """
+    Test upserts and queries of the index
+    """
+
+    def setUp(self):
+        """
+        Index a few repos of two orgs
+        """
+        self.index = RepoIndex()
+        self.index.upsert("google", [
+            repo(1, "a", stars=10),
+            repo(2, "b", stars=300, updated_at="2021-06-01T00:00:00Z"),
+            repo(3, "c", stars=200, fork=True),
+            repo(4, "d", language="Go", stars=500, license=None),
+        ])
+        self.index.upsert("abc", [repo(1, "e", stars=1000)])
+
+    def tearDown(self):
+        """
+        Close the index
+        """
+        self.index.close()
+
+    def test_query(self):
+        """
+        Filters combine and results are sorted
+        """
+        rows = self.index.query(org="google", language="Python",
+                                fork=False, min_stars=5,
+                                order_by="watchers_count", descending=True)
+        self.assertEqual([row["name"] for row in rows], ["b", "a"])
+        rows = self.index.query(updated_since="2021-01-01",
+                                columns=("name", "stargazers_count"))
+        self.assertEqual(rows, [{"name": "b", "stargazers_count": 300}])
+        rows = self.index.query(min_stars=200, order_by="stargazers_count",
+                                limit=2)
+        self.assertEqual([row["org"] for row in rows], ["google", "google"])
+
+    def test_upsert_updates_in_place(self):
+        """
+        Repos are keyed by org and id
+        """
+        self.index.upsert("google", [repo(1, "a", stars=999)])
+        rows = self.index.query(org="google", min_stars=999)
+        self.assertEqual([row["name"] for row in rows], ["a"])
+        self.assertEqual(len(self.index.query(org="google")), 4)
+
+    def test_replace(self):
+        """
+        Replacing an org drops its deleted repos only
+        """
+        self.index.replace("google", [repo(1, "a")])
+        self.assertEqual(len(self.index.query(org="google")), 1)
+        self.assertIn("abc", self.index)
+
+    def test_watermark(self):
+        """
+        Sync watermarks are kept per org
+        """
+        self.assertIsNone(self.index.watermark("google"))
+        self.index.set_watermark("google", "2021-06-01T00:00:00Z")
+        self.index.set_watermark("google", "2021-07-01T00:00:00Z")
+        self.assertEqual(self.index.watermark("google"),
+                         "2021-07-01T00:00:00Z")
+        self.assertIsNone(self.index.watermark("abc"))
+
+    def test_unknown_column(self):
+        """
+        Columns are validated before reaching SQL
+        """
+        with self.assertRaises(ValueError):
+            self.index.query(order_by="name; DROP TABLE repos")
+
+    def test_secondary_indexes(self):
+        """
+        Only the configured columns keep a secondary index
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "repos.db")
+            RepoIndex(path, indexed=("language", "updated_at")).close()
+            index = RepoIndex(path, indexed=("language",))
+            names = [row["name"] for row in index._connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' "
+                "AND name LIKE 'repos_%'")]
+            index.close()
+        self.assertEqual(names, ["repos_language"])
+        with self.assertRaises(ValueError):
+            RepoIndex(indexed=("name",))
+
+    @patch("client.get_json_pages")
+    @patch("client.get_json")
+    def test_client_query_repos(self, mock_get_json, mock_pages):
+        """
+        The client indexes its org on the first query
+        """
+        org_payload, repos_payload, _, apache2_repos = \
+            fixtures.TEST_PAYLOAD[0]
+        mock_get_json.return_value = org_payload
+        mock_pages.return_value = iter([repos_payload])
+        GithubOrgClient.repo_index = RepoIndex()
+        try:
+            github_client = GithubOrgClient("google")
+            self.assertEqual(
+                github_client.query_repos(license="apache-2.0", order_by="id"),
+                apache2_repos)
+            self.assertEqual(github_client.query_repos(license="gpl"), [])
+        finally:
+            GithubOrgClient.repo_index.close()
+            GithubOrgClient.repo_index = None
+        mock_pages.assert_called_once()
+
+    @patch("client.get_json_pages")
+    @patch("client.get_json")
+    def test_client_indexes_raw_repos(self, mock_get_json, mock_pages):
+        """
+        A projected payload does not leave the indexed columns empty
+        """
+        org_payload, repos_payload = fixtures.TEST_PAYLOAD[0][:2]
+        mock_get_json.return_value = org_payload
+        mock_pages.side_effect = lambda url: iter([repos_payload])
+        GithubOrgClient.repo_index = RepoIndex()
+        try:
+            github_client = GithubOrgClient("google", RepoProjection())
+            github_client.repos_payload
+            self.assertEqual(github_client.query_repos(language="Java",
+                                                       order_by="id"),
+                             [repo["name"] for repo in repos_payload
+                              if repo["language"] == "Java"])
+        finally:
+            GithubOrgClient.repo_index.close()
+            GithubOrgClient.repo_index = None
+
+    @patch("client.get_json_pages")
+    @patch("client.get_json")
+    def test_revalidate_drops_deleted_repos(self, mock_get_json, mock_pages):
+        """
+        Revalidating replaces the indexed repos of the org
+        """
+        mock_get_json.return_value = {"repos_url": "https://x/repos"}
+        mock_pages.return_value = iter([[repo(1, "a"), repo(2, "b")]])
+        GithubOrgClient.repo_index = RepoIndex()
+        try:
+            github_client = GithubOrgClient("test_org")
+            self.assertEqual(github_client.query_repos(), ["a", "b"])
+            mock_pages.return_value = iter([[repo(1, "a")]])
+            github_client.revalidate()
+            self.assertEqual(github_client.public_repos(), ["a"])
+            self.assertEqual(github_client.query_repos(), ["a"])
+        finally:
+            GithubOrgClient.repo_index.close()
+            GithubOrgClient.repo_index = None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+A Test module for the rate-limit-aware scheduler.
+"""
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scheduler import BULK, INTERACTIVE, RateLimitScheduler, request_priority
+from utils import configure_cache, configure_scheduler, get_json
+
+
+class RateLimitedHandler(BaseHTTPRequestHandler):
+    """
+    Answer with a rate-limit budget that the test sets on the server.
+    """
+
+    def do_GET(self):
+        """
+        Serve a tiny payload with the next budget headers
+        """
+        remaining, reset_in = self.server.budget.pop(0)
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-RateLimit-Remaining", str(remaining))
+        self.send_header("X-RateLimit-Reset", str(time.time() + reset_in))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """
+        Keep the test output quiet
+        """
+
+
+class TestRateLimitScheduler(unittest.TestCase):
+    """
+    Test pacing, priorities and adaptive concurrency
+    """
+
+    def test_exhausted_budget_waits_for_reset(self):
+        """
+        Requests hold until the announced reset once the budget is spent
+        """
+        server = ThreadingHTTPServer(("127.0.0.1", 0), RateLimitedHandler)
+        server.budget = [(0, 0.3), (100, 60)]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = "http://127.0.0.1:{}/orgs/".format(server.server_port)
+        scheduler = RateLimitScheduler(rate=100, burst=10)
+        configure_scheduler(scheduler)
+        configure_cache(max_entries=0)
+        try:
+            get_json(url + "a")
+            start = time.monotonic()
+            self.assertEqual(get_json(url + "b"), {"path": "/orgs/b"})
+            self.assertGreater(time.monotonic() - start, 0.2)
+        finally:
+            configure_scheduler(None)
+            configure_cache()
+            server.shutdown()
+            server.server_close()
+
+        stats = scheduler.stats()
+        self.assertEqual(stats["rate_limited"], 1)
+        self.assertEqual(stats["requests"], 2)
+        self.assertAlmostEqual(stats["rate"], 100 / 60, delta=0.1)
+
+    def test_interactive_overtakes_bulk(self):
+        """
+        Waiting interactive requests are served before bulk ones
+        """
+        scheduler = RateLimitScheduler(rate=20, burst=1)
+        scheduler.acquire()
+        order = []
+
+        def request(priority, name):
+            with request_priority(priority):
+                scheduler.acquire()
+            order.append(name)
+            scheduler.release(0.0)
+
+        threads = [threading.Thread(target=request, args=(BULK, "bulk"))]
+        threads[0].start()
+        time.sleep(0.01)
+        threads.append(threading.Thread(target=request,
+                                        args=(INTERACTIVE, "interactive")))
+        threads[1].start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(order, ["interactive", "bulk"])
+
+    def test_concurrency_follows_latency(self):
+        """
+        Slow responses halve concurrency and fast ones grow it back
+        """
+        scheduler = RateLimitScheduler(rate=1000, burst=100,
+                                       max_concurrency=8,
+                                       target_latency=0.5)
+        scheduler.acquire()
+        scheduler.release(2.0)
+        self.assertEqual(scheduler.concurrency, 4)
+        for _ in range(40):
+            scheduler.acquire()
+            scheduler.release(0.1)
+        self.assertEqual(scheduler.concurrency, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
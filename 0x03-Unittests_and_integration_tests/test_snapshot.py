@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+A Test module for the warm-start snapshot store.
+"""
+import json
+import os
+import tempfile
+import time
+import unittest
+import zlib
+from unittest.mock import patch
+
+import fixtures
+from client import GithubOrgClient
+from snapshot import SnapshotStore
+
+
+class TestSnapshotStore(unittest.TestCase):
+    """
+    Test persisting payloads across store instances
+    """
+
+    def setUp(self):
+        """
+        Work in a fresh directory
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name
+
+    def tearDown(self):
+        """
+        Remove the directory
+        """
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """
+        Payloads survive reopening the store
+        """
+        org_payload, repos_payload = fixtures.TEST_PAYLOAD[0][:2]
+        store = SnapshotStore(self.path)
+        store.put("google/org", org_payload)
+        store.put("google/repos", repos_payload)
+        store.close()
+
+        reopened = SnapshotStore(self.path)
+        self.assertEqual(len(reopened), 2)
+        self.assertEqual(reopened.get("google/repos"), repos_payload)
+        self.assertEqual(reopened.get("google/org"), org_payload)
+        self.assertIsNone(reopened.get("abc/org"))
+
+    def test_supersede_and_compact(self):
+        """
+        The latest payload wins and compaction drops the others
+        """
+        store = SnapshotStore(self.path)
+        store.put("google/org", {"v": 1})
+        store.get("google/org")
+        store.put("google/org", {"v": 2})
+        store.put("abc/org", {"v": 3})
+        self.assertEqual(store.get("google/org"), {"v": 2})
+
+        data_file = os.path.join(self.path, SnapshotStore.DATA_FILE)
+        size = os.path.getsize(data_file)
+        store.compact()
+        self.assertLess(os.path.getsize(data_file), size)
+        self.assertEqual(SnapshotStore(self.path).get("google/org"),
+                         {"v": 2})
+        self.assertEqual(store.get("abc/org"), {"v": 3})
+
+    def test_max_age(self):
+        """
+        Payloads past their maximum age are not served
+        """
+        store = SnapshotStore(self.path, max_age=60)
+        store.put("google/org", {"v": 1})
+        self.assertEqual(store.get("google/org"), {"v": 1})
+        with patch("snapshot.time.time", return_value=time.time() + 61):
+            self.assertIsNone(store.get("google/org"))
+            self.assertIn("google/org", store)
+
+    def test_payloads_are_decoded_once(self):
+        """
+        Repeated gets reuse the decoded payload until it is superseded
+        """
+        store = SnapshotStore(self.path)
+        store.put("google/repos", [{"name": "a"}])
+        with patch("snapshot.zlib.decompress",
+                   wraps=zlib.decompress) as decompress:
+            first = store.get("google/repos")
+            self.assertIs(store.get("google/repos"), first)
+            store.put("google/repos", [{"name": "b"}])
+            self.assertEqual(store.get("google/repos"), [{"name": "b"}])
+        self.assertEqual(decompress.call_count, 2)
+
+    def test_shared_between_processes(self):
+        """
+        Writers merge the index on disk and readers follow compactions
+        """
+        first, second = SnapshotStore(self.path), SnapshotStore(self.path)
+        first.put("google/org", {"v": 1})
+        second.put("abc/org", {"v": 2})
+        first.put("google/org", {"v": 3})
+        self.assertEqual(second.get("google/org"), {"v": 3})
+
+        second.compact()
+        first.put("xyz/org", {"v": 4})
+        reopened = SnapshotStore(self.path)
+        self.assertEqual(sorted(reopened.keys()),
+                         ["abc/org", "google/org", "xyz/org"])
+        self.assertEqual(first.get("abc/org"), {"v": 2})
+        self.assertEqual(first.get("xyz/org"), {"v": 4})
+        self.assertEqual(reopened.get("google/org"), {"v": 3})
+
+    def test_reader_sees_new_keys(self):
+        """
+        A store that only reads picks up keys written by another one
+        """
+        reader, writer = SnapshotStore(self.path), SnapshotStore(self.path)
+        self.assertIsNone(reader.get("google/org"))
+        writer.put("google/org", {"v": 1})
+        self.assertEqual(reader.get("google/org"), {"v": 1})
+        writer.put("google/org", {"v": 2})
+        self.assertEqual(reader.get("google/org"), {"v": 2})
+
+    def test_compact_without_data_file(self):
+        """
+        Entries whose data file is gone are dropped by compaction
+        """
+        SnapshotStore(self.path).put("google/org", {"v": 1})
+        os.remove(os.path.join(self.path, SnapshotStore.DATA_FILE))
+        store = SnapshotStore(self.path)
+        self.assertIsNone(store.get("google/org"))
+        store.compact()
+        self.assertEqual(len(SnapshotStore(self.path)), 0)
+
+    def test_other_format_is_ignored(self):
+        """
+        A store written in another format opens empty
+        """
+        SnapshotStore(self.path).put("google/org", {})
+        index_file = os.path.join(self.path, SnapshotStore.INDEX_FILE)
+        with open(index_file) as index:
+            content = json.load(index)
+        content["format"] = "marshal-0"
+        with open(index_file, "w") as index:
+            json.dump(content, index)
+
+        self.assertEqual(len(SnapshotStore(self.path)), 0)
+
+    @patch("client.get_json_pages")
+    @patch("client.get_json")
+    def test_client_warm_start(self, mock_get_json, mock_pages):
+        """
+        A new client starts from the snapshot and revalidates on demand
+        """
+        org_payload, repos_payload, expected_repos, _ = \
+            fixtures.TEST_PAYLOAD[0]
+        mock_get_json.return_value = org_payload
+        mock_pages.side_effect = lambda url: iter([repos_payload])
+        GithubOrgClient.snapshots = SnapshotStore(self.path)
+        try:
+            self.assertEqual(GithubOrgClient("google").repos_payload,
+                             repos_payload)
+            GithubOrgClient.snapshots = SnapshotStore(self.path)
+            mock_get_json.reset_mock()
+            mock_pages.reset_mock()
+
+            warm_client = GithubOrgClient("google")
+            self.assertEqual(warm_client.public_repos(), expected_repos)
+            mock_get_json.assert_not_called()
+            mock_pages.assert_not_called()
+
+            mock_pages.side_effect = lambda url: iter([repos_payload[:1]])
+            warm_client.revalidate()
+            self.assertEqual(warm_client.public_repos(), expected_repos[:1])
+            self.assertEqual(
+                GithubOrgClient("google").public_repos(),
+                expected_repos[:1])
+        finally:
+            GithubOrgClient.snapshots = None
+
+    @patch("client.get_json_pages")
+    @patch("client.get_json")
+    def test_client_refetches_stale_snapshot(self, mock_get_json,
+                                             mock_pages):
+        """
+        A new client fetches again once the snapshot is too old
+        """
+        org_payload, repos_payload, expected_repos, _ = \
+            fixtures.TEST_PAYLOAD[0]
+        mock_get_json.return_value = org_payload
+        mock_pages.side_effect = lambda url: iter([repos_payload])
+        GithubOrgClient.snapshots = SnapshotStore(self.path, max_age=60)
+        try:
+            GithubOrgClient("google").public_repos()
+            mock_get_json.reset_mock()
+            mock_pages.reset_mock()
+
+            with patch("snapshot.time.time",
+                       return_value=time.time() + 61):
+                self.assertEqual(GithubOrgClient("google").public_repos(),
+                                 expected_repos)
+            mock_get_json.assert_called_once()
+            mock_pages.assert_called_once()
+        finally:
+            GithubOrgClient.snapshots = None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,8 +5,32 @@ A Test Module.
 
 import unittest
 from parameterized import parameterized
-from utils import access_nested_map, get_json, memoize
-from unittest.mock import patch
+from utils import (
+    access_nested_map,
+    async_memoize,
+    cache_stats,
+    compile_path,
+    configure_cache,
+    configure_session,
+    decode_json,
+    extract_columns,
+    get_json,
+    get_json_many,
+    get_json_pages,
+    get_json_stream,
+    get_session,
+    iter_json_array,
+    memoize,
+    memoize_ttl,
+)
+import asyncio
+import codecs
+import json
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
 
 
 class TestAccessNestedMap(unittest.TestCase):
@@ -32,6 +56,44 @@ class TestAccessNestedMap(unittest.TestCase):
             result = access_nested_map(map, path)
 
 
+class TestCompilePath(unittest.TestCase):
+    """
+    A Test class for compiled path getters
+    """
+
+    @parameterized.expand([
+        ({"a": 1}, ("a",), 1),
+        ({"a": {"b": 2}}, ("a",), {"b": 2}),
+        ({"a": {"b": 2}}, ("a", "b"), 2),
+    ])
+    def test_compile_path(self, nested_map, path, expected_result):
+        """ The getter matches access_nested_map """
+        self.assertEqual(compile_path(path)(nested_map), expected_result)
+
+    @parameterized.expand([
+        ({}, ["a"]),
+        ({"a": 1}, ["a", "b"]),
+        ([1], [0]),
+    ])
+    def test_compile_path_exception(self, map, path):
+        """ Test that keyErrors are raised for invalid key"""
+        with self.assertRaises(KeyError):
+            compile_path(path)(map)
+
+    def test_extract_columns(self):
+        """ Several paths are extracted in one pass """
+        records = [
+            {"name": "a", "license": {"key": "mit"}},
+            {"name": "b", "license": None},
+        ]
+        columns = {"name": ["name"], "license": ["license", "key"]}
+
+        self.assertEqual(extract_columns(records, columns, default=None),
+                         {"name": ["a", "b"], "license": ["mit", None]})
+        with self.assertRaises(KeyError):
+            extract_columns(records, columns)
+
+
 class TestGetJson(unittest.TestCase):
     """ Test class for get_json function """
 
@@ -39,15 +101,235 @@ class TestGetJson(unittest.TestCase):
         ("http://example.com", {"payload": True}),
         ("http://holberton.io", {"payload": False})
     ])
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_json(self, test_url, test_payload, mock_get):
-        """ Mock the requests.get method """
-        mock_get.return_value.json.return_value = test_payload
+        """ Mock the pooled session's get method """
+        mock_get.return_value.content = json.dumps(test_payload).encode()
         result = get_json(test_url)
 
         mock_get.assert_called_once_with(test_url)
         self.assertEqual(result, test_payload)
 
+    @patch('requests.Session.get')
+    def test_get_json_pages(self, mock_get):
+        """ Pages are fetched lazily by following the next link """
+        first = MagicMock(**{
+            "content": b"[1, 2]",
+            "links": {"next": {"url": "http://example.com?page=2"}},
+        })
+        last = MagicMock(**{"content": b"[3]", "links": {}})
+        mock_get.side_effect = [first, last]
+
+        pages = get_json_pages("http://example.com")
+        self.assertEqual(next(pages), [1, 2])
+        mock_get.assert_called_once_with("http://example.com")
+        self.assertEqual(list(pages), [[3]])
+        mock_get.assert_called_with("http://example.com?page=2")
+
+    def test_decode_json(self):
+        """ Bodies are decoded as UTF-8 with or without orjson """
+        body = codecs.BOM_UTF8 + '{"name": "caf\u00e9"}'.encode()
+        self.assertEqual(decode_json(body), {"name": "caf\u00e9"})
+        with patch("utils._loads", json.loads):
+            self.assertEqual(decode_json(body), {"name": "caf\u00e9"})
+        with self.assertRaises(ValueError):
+            decode_json(b'{"name": ')
+
+    def test_session_is_shared(self):
+        """ The same keep-alive session is reused across calls """
+        session = configure_session(pool_size=4)
+        self.assertIs(get_session(), session)
+        self.assertIs(get_session(), session)
+        self.assertEqual(session.get_adapter("https://x")._pool_maxsize, 4)
+
+    @patch('requests.Session.get')
+    def test_get_json_many(self, mock_get):
+        """ Results come back in input order """
+        mock_get.side_effect = lambda url: MagicMock(
+            content=json.dumps({"url": url}).encode())
+        urls = ["http://example.com/{}".format(i) for i in range(20)]
+
+        results = get_json_many(urls, max_workers=4)
+
+        self.assertEqual(results, [{"url": url} for url in urls])
+        self.assertEqual(mock_get.call_count, 20)
+
+    @patch('utils.ThreadPoolExecutor', wraps=ThreadPoolExecutor)
+    @patch('requests.Session.get')
+    def test_get_json_many_uses_the_pool_size(self, mock_get, mock_pool):
+        """ Workers default to the configured pool size """
+        mock_get.return_value = MagicMock(content=b"{}")
+        configure_session(pool_size=3)
+        try:
+            get_json_many(["http://example.com/a", "http://example.com/b"])
+        finally:
+            configure_session()
+
+        mock_pool.assert_called_once_with(max_workers=3)
+
+
+class TestJsonStream(unittest.TestCase):
+    """ Test class for incremental JSON array decoding """
+
+    payload = [{"name": "caf\u00e9", "stars": 12345}, 678, [], "x"]
+
+    @parameterized.expand([(1,), (3,), (1024,)])
+    def test_iter_json_array(self, chunk_size):
+        """ Elements are decoded whatever the chunk boundaries """
+        raw = json.dumps(self.payload, ensure_ascii=False).encode()
+        chunks = [raw[i:i + chunk_size]
+                  for i in range(0, len(raw), chunk_size)]
+        self.assertEqual(list(iter_json_array(chunks)), self.payload)
+
+    @parameterized.expand([
+        ([b"[1.", b"5]"], [1.5]),
+        ([b"[1e", b"5]"], [1e5]),
+        ([b"[2, -", b"1", b"0E-", b"1]"], [2, -1.0]),
+        ([b"[12", b"3, 4", b"5]"], [123, 45]),
+        ([b"[tr", b"ue, nu", b"ll]"], [True, None]),
+        ([codecs.BOM_UTF8 + b'["a"', b"]"], ["a"]),
+    ])
+    def test_iter_json_array_splits(self, chunks, expected):
+        """ Numbers and literals split across chunks, and a BOM """
+        self.assertEqual(list(iter_json_array(chunks)), expected)
+
+    @parameterized.expand([(b"{}",), (b"[1 2]",), (b"[1,",)])
+    def test_iter_json_array_invalid(self, raw):
+        """ Malformed arrays raise ValueError """
+        with self.assertRaises(ValueError):
+            list(iter_json_array([raw]))
+
+    def test_elements_are_yielded_before_the_end(self):
+        """ The first element is available before the body is read """
+        def chunks():
+            yield b'[{"name": "a"},'
+            raise AssertionError("read too far")
+
+        self.assertEqual(next(iter_json_array(chunks())), {"name": "a"})
+
+    @patch('requests.Session.get')
+    def test_get_json_stream(self, mock_get):
+        """ Every page is streamed in order """
+        mock_get.side_effect = [
+            MagicMock(links={"next": {"url": "http://example.com/2"}},
+                      **{"iter_content.return_value": [b"[1, ", b"2]"]}),
+            MagicMock(links={},
+                      **{"iter_content.return_value": [b"[3]"]}),
+        ]
+
+        self.assertEqual(list(get_json_stream("http://example.com")),
+                         [1, 2, 3])
+        mock_get.assert_called_with("http://example.com/2", stream=True)
+
+
+class TestValidationCache(unittest.TestCase):
+    """ Test class for the conditional-request cache of get_json """
+
+    url = "http://example.com/orgs/google"
+
+    def setUp(self):
+        """ Start every test from an empty cache """
+        configure_cache(max_entries=2)
+
+    def tearDown(self):
+        """ Restore the default cache """
+        configure_cache()
+
+    @staticmethod
+    def response(status_code, payload=None):
+        """ Build a response carrying an ETag """
+        return MagicMock(status_code=status_code,
+                         headers={"ETag": '"v1"'}, links={},
+                         content=json.dumps(payload).encode())
+
+    @patch('requests.Session.get')
+    def test_not_modified_is_served_from_cache(self, mock_get):
+        """ A 304 answer reuses the cached body """
+        mock_get.side_effect = [self.response(200, {"v": 1}),
+                                self.response(304)]
+
+        self.assertEqual(get_json(self.url), {"v": 1})
+        self.assertEqual(get_json(self.url), {"v": 1})
+
+        mock_get.assert_called_with(self.url,
+                                    headers={"If-None-Match": '"v1"'})
+        self.assertEqual(cache_stats(), {"hits": 0, "misses": 1,
+                                         "revalidations": 1,
+                                         "bytes_saved": 8, "entries": 1,
+                                         "bytes": 8})
+
+    @patch('requests.Session.get')
+    def test_fresh_entries_skip_the_network(self, mock_get):
+        """ Within the TTL no request is sent at all """
+        configure_cache(ttl=60)
+        mock_get.return_value = self.response(200, {"v": 1})
+
+        get_json(self.url)
+        get_json(self.url)
+
+        mock_get.assert_called_once_with(self.url)
+        self.assertEqual(cache_stats()["hits"], 1)
+
+    @patch('requests.Session.get')
+    def test_hits_are_not_shared(self, mock_get):
+        """ Mutating a payload does not corrupt the cached body """
+        configure_cache(ttl=60)
+        mock_get.return_value = self.response(200, {"v": [1]})
+
+        get_json(self.url)["v"].append(2)
+        self.assertEqual(get_json(self.url), {"v": [1]})
+        mock_get.assert_called_once_with(self.url)
+
+    @patch('requests.Session.get')
+    def test_lru_eviction(self, mock_get):
+        """ The least recently used URL is evicted first """
+        mock_get.return_value = self.response(200, {})
+        for path in ("a", "b", "a", "c"):
+            get_json(self.url + path)
+
+        self.assertEqual(cache_stats()["entries"], 2)
+        get_json(self.url + "b")
+        mock_get.assert_called_with(self.url + "b")
+
+    @patch('requests.Session.get')
+    def test_byte_bound(self, mock_get):
+        """ The least recently used bodies are evicted past max_bytes """
+        configure_cache(max_bytes=20)
+        mock_get.return_value = self.response(200, "x" * 8)
+        for path in ("a", "b", "c"):
+            get_json(self.url + path)
+
+        self.assertEqual(cache_stats()["entries"], 2)
+        self.assertEqual(cache_stats()["bytes"], 20)
+
+    @patch('requests.Session.get')
+    def test_paging_memory_is_bounded(self, mock_get):
+        """ Paging through a large org keeps only the last pages cached """
+        configure_cache(max_bytes=2 ** 20)
+        content = json.dumps([{"name": "x" * 1000}] * 100).encode()
+
+        def page(url):
+            """ One of 100 pages of about 100 kB """
+            number = int(url.rsplit("=", 1)[1])
+            links = {}
+            if number < 100:
+                links["next"] = {"url": "{}?page={}".format(self.url,
+                                                            number + 1)}
+            return MagicMock(status_code=200,
+                             headers={"ETag": '"{}"'.format(number)},
+                             links=links, content=content)
+
+        mock_get.side_effect = page
+        tracemalloc.start()
+        pages = sum(1 for _ in get_json_pages(self.url + "?page=1"))
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertEqual(pages, 100)
+        self.assertLessEqual(cache_stats()["bytes"], 2 ** 20)
+        # 100 decoded pages would hold more than 10 MB
+        self.assertLess(retained, 4 * 2 ** 20)
+
 
 class TestMemoize(unittest.TestCase):
     """A class to test memoization
@@ -95,5 +377,148 @@ class TestMemoize(unittest.TestCase):
             self.assertEqual(result2, 42)
 
 
+class TestMemoizeTTL(unittest.TestCase):
+    """A class to test expiring, single-flight memoization
+    """
+
+    def make_class(self, **kwargs):
+        """
+        Build a class whose property counts its computations.
+        """
+        class TestClass:
+            """
+            Sample class to be tested.
+            """
+            calls = 0
+
+            @memoize_ttl(**kwargs)
+            def a_property(self):
+                """
+                Count and return the number of computations.
+                """
+                time.sleep(0.05)
+                type(self).calls += 1
+                return type(self).calls
+
+        return TestClass
+
+    def test_expiry(self):
+        """
+        The value is recomputed once the TTL has elapsed.
+        """
+        TestClass = self.make_class(ttl=60)
+        test_instance = TestClass()
+        self.assertEqual(test_instance.a_property, 1)
+        self.assertEqual(test_instance.a_property, 1)
+        with patch("utils.time.monotonic", return_value=time.monotonic() + 61):
+            self.assertEqual(test_instance.a_property, 2)
+
+    def test_invalidate_and_refresh(self):
+        """
+        invalidate drops the value and refresh recomputes it.
+        """
+        TestClass = self.make_class()
+        test_instance = TestClass()
+        self.assertEqual(test_instance.a_property, 1)
+        TestClass.a_property.invalidate(test_instance)
+        self.assertEqual(test_instance.a_property, 2)
+        self.assertEqual(TestClass.a_property.refresh(test_instance), 3)
+        self.assertEqual(test_instance.a_property, 3)
+
+    def test_single_flight(self):
+        """
+        Concurrent cold reads share a single computation.
+        """
+        TestClass = self.make_class(ttl=60)
+        test_instance = TestClass()
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(test_instance.a_property))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [1] * 8)
+        self.assertEqual(TestClass.calls, 1)
+
+    def test_refresh_ahead(self):
+        """
+        Reads close to expiry refresh in the background without blocking.
+        """
+        TestClass = self.make_class(ttl=60, refresh_ahead=10)
+        test_instance = TestClass()
+        self.assertEqual(test_instance.a_property, 1)
+        with patch("utils.time.monotonic", return_value=time.monotonic() + 55):
+            self.assertEqual(test_instance.a_property, 1)
+        for _ in range(100):
+            if test_instance.a_property == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(test_instance.a_property, 2)
+        self.assertEqual(TestClass.calls, 2)
+
+
+class TestAsyncMemoize(unittest.IsolatedAsyncioTestCase):
+    """A class to test coroutine memoization
+    """
+
+    def make_instance(self, fail_first=False):
+        """
+        Build an instance whose coroutine property counts its calls.
+        """
+        class TestClass:
+            """
+            Sample class to be tested.
+            """
+            calls = 0
+
+            @async_memoize
+            async def a_property(self):
+                """
+                Count and return the number of calls.
+                """
+                type(self).calls += 1
+                await asyncio.sleep(0.01)
+                if fail_first and type(self).calls == 1:
+                    raise KeyError("first")
+                return type(self).calls
+
+        return TestClass()
+
+    async def test_async_memoize(self):
+        """
+        Concurrent awaiters share one call and the result is cached.
+        """
+        test_instance = self.make_instance()
+        results = await asyncio.gather(
+            *(test_instance.a_property for _ in range(5)))
+        self.assertEqual(results, [1] * 5)
+        self.assertEqual(await test_instance.a_property, 1)
+        self.assertEqual(type(test_instance).calls, 1)
+
+    async def test_failures_are_not_cached(self):
+        """
+        A failed call is retried on the next access.
+        """
+        test_instance = self.make_instance(fail_first=True)
+        with self.assertRaises(KeyError):
+            await test_instance.a_property
+        self.assertEqual(await test_instance.a_property, 2)
+
+    async def test_cancelled_awaiter(self):
+        """
+        Cancelling one awaiter leaves the shared call running.
+        """
+        test_instance = self.make_instance()
+        first = asyncio.ensure_future(test_instance.a_property)
+        second = asyncio.ensure_future(test_instance.a_property)
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
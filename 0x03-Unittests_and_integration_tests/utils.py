@@ -1,20 +1,62 @@
 #!/usr/bin/env python3
 """Generic utilities for github org client.
 """
+import asyncio
+import codecs
+import json
+import re
 import requests
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
+from hedging import HedgingPolicy
+from instrumentation import MemoizeEvent, RequestEvent, url_template
+from scheduler import RateLimitScheduler
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
 from typing import (
     Mapping,
     Sequence,
     Any,
+    Awaitable,
     Dict,
+    List,
+    Iterable,
     Callable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Tuple,
 )
 
 __all__ = [
+    "TTLMemoized",
+    "ValidationCache",
     "access_nested_map",
+    "add_hooks",
+    "async_memoize",
+    "cache_stats",
+    "compile_path",
+    "configure_cache",
+    "configure_hedging",
+    "configure_scheduler",
+    "configure_session",
+    "decode_json",
+    "extract_columns",
+    "get_session",
     "get_json",
+    "get_json_many",
+    "get_json_pages",
+    "get_json_stream",
+    "iter_json_array",
     "memoize",
+    "memoize_ttl",
+    "remove_hooks",
 ]
 
 
@@ -40,15 +82,549 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     return nested_map
 
 
+def compile_path(path: Sequence) -> Callable[[Mapping], Any]:
+    """Compile a key path into a reusable getter.
+    The getter raises KeyError exactly like ``access_nested_map``, but
+    only falls back to the slow ``Mapping`` ABC check for values that
+    are not plain dicts.
+    Example
+    -------
+    >>> get_c = compile_path(["a", "b", "c"])
+    >>> get_c({"a": {"b": {"c": 1}}})
+    1
+    """
+    keys = tuple(path)
+
+    if len(keys) == 1:
+        key, = keys
+
+        def getter(nested_map: Mapping) -> Any:
+            if type(nested_map) is not dict \
+                    and not isinstance(nested_map, Mapping):
+                raise KeyError(key)
+            return nested_map[key]
+    else:
+        def getter(nested_map: Mapping) -> Any:
+            for key in keys:
+                if type(nested_map) is not dict \
+                        and not isinstance(nested_map, Mapping):
+                    raise KeyError(key)
+                nested_map = nested_map[key]
+            return nested_map
+
+    return getter
+
+
+_MISSING = object()
+
+
+def extract_columns(records: Iterable[Mapping],
+                    columns: Mapping[str, Sequence],
+                    default: Any = _MISSING) -> Dict[str, List]:
+    """Extract several key paths from every record in a single pass.
+    Parameters
+    ----------
+    records: Iterable[Mapping]
+        The nested maps to read from
+    columns: Mapping[str, Sequence]
+        Column name to key path
+    default: Any
+        Value used when a path is missing; KeyError is raised if omitted
+    Example
+    -------
+    >>> repos = [{"name": "a", "license": {"key": "mit"}}, {"name": "b"}]
+    >>> extract_columns(repos, {"name": ["name"],
+    ...                         "license": ["license", "key"]}, None)
+    {'name': ['a', 'b'], 'license': ['mit', None]}
+    """
+    result = {name: [] for name in columns}
+    getters = [(result[name].append, compile_path(path))
+               for name, path in columns.items()]
+    for record in records:
+        for append, getter in getters:
+            try:
+                append(getter(record))
+            except KeyError:
+                if default is _MISSING:
+                    raise
+                append(default)
+    return result
+
+
+POOL_SIZE = 10
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.RLock()
+# Connections per host of the shared session
+_pool_size = POOL_SIZE
+
+
+def configure_session(pool_size: int = POOL_SIZE) -> requests.Session:
+    """Replace the shared session with one keeping up to ``pool_size``
+    keep-alive connections per host.
+    """
+    global _session, _pool_size
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                            pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    with _session_lock:
+        previous, _session = _session, session
+        _pool_size = pool_size
+    if previous is not None:
+        previous.close()
+    return session
+
+
+def get_session() -> requests.Session:
+    """Get the shared, lazily created keep-alive session.
+    """
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                configure_session()
+    return _session
+
+
+# Default bound on the encoded size of the bodies in the validation cache
+MAX_CACHE_BYTES = 8 * 2 ** 20
+
+
+class CacheEntry(NamedTuple):
+    """A cached encoded response body with its HTTP validators"""
+    content: bytes
+    links: Dict
+    etag: Optional[str]
+    last_modified: Optional[str]
+    size: int
+    stored_at: float
+
+
+class ValidationCache:
+    """Size-bounded LRU cache of JSON bodies validated with
+    ``ETag``/``If-None-Match`` and ``Last-Modified``/``If-Modified-Since``.
+    Entries younger than ``ttl`` seconds are served without any request,
+    older ones are revalidated with a conditional request.
+    Both the number of entries and the total size of their encoded
+    bodies are bounded, so paging through a large org keeps only the
+    most recent pages. Bodies are kept encoded and decoded on every
+    hit, so callers never share, and cannot corrupt, a cached payload.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 0.0,
+                 max_bytes: int = MAX_CACHE_BYTES) -> None:
+        """Init method of ValidationCache"""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ("hits", "misses", "revalidations", "bytes_saved"), 0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Get the entry cached for ``url``, marking it recently used"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Whether ``entry`` can be served without revalidation"""
+        return time.monotonic() - entry.stored_at < self.ttl
+
+    def store(self, url: str, response: requests.Response) -> None:
+        """Cache a successful response carrying a validator"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        size = len(response.content)
+        if size > self.max_bytes:
+            return
+        entry = CacheEntry(response.content, dict(response.links), etag,
+                           last_modified, size, time.monotonic())
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[url] = entry
+            self._bytes += size
+            while (len(self._entries) > self.max_entries
+                   or self._bytes > self.max_bytes):
+                self._bytes -= self._entries.popitem(last=False)[1].size
+
+    def hit(self, url: str, entry: CacheEntry,
+            revalidated: bool = False) -> None:
+        """Record that ``entry`` was served, refreshing it if revalidated"""
+        with self._lock:
+            if revalidated:
+                self._stats["revalidations"] += 1
+                if url in self._entries:
+                    self._entries[url] = entry._replace(
+                        stored_at=time.monotonic())
+            else:
+                self._stats["hits"] += 1
+            self._stats["bytes_saved"] += entry.size
+
+    def miss(self) -> None:
+        """Record a full download"""
+        with self._lock:
+            self._stats["misses"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and revalidation counters"""
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries),
+                        bytes=self._bytes)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+_cache: Optional[ValidationCache] = ValidationCache()
+
+
+def configure_cache(max_entries: int = 1024, ttl: float = 0.0,
+                    max_bytes: int = MAX_CACHE_BYTES
+                    ) -> Optional[ValidationCache]:
+    """Replace the validation cache used by ``get_json``.
+    A ``max_entries`` or ``max_bytes`` of 0 disables caching.
+    """
+    global _cache
+    _cache = ValidationCache(max_entries, ttl, max_bytes) \
+        if max_entries and max_bytes else None
+    return _cache
+
+
+_scheduler: Optional[RateLimitScheduler] = None
+
+
+def configure_scheduler(scheduler: Optional[RateLimitScheduler]) -> None:
+    """Pace every request of ``get_json`` through ``scheduler``, or stop
+    pacing with None.
+    """
+    global _scheduler
+    _scheduler = scheduler
+
+
+_hedging: Optional[HedgingPolicy] = None
+
+
+def configure_hedging(policy: Optional[HedgingPolicy]) -> None:
+    """Hedge the slow requests of ``get_json`` under ``policy``, or stop
+    hedging with None.
+    """
+    global _hedging
+    _hedging = policy
+
+
+# Instrumentation hooks; empty tuples cost one check per request, and
+# memoize properties only check them while the hooks are registered
+_request_hooks: Tuple[Callable[[RequestEvent], None], ...] = ()
+_memoize_hooks: Tuple[Callable[[MemoizeEvent], None], ...] = ()
+
+
+def add_hooks(on_request: Callable[[RequestEvent], None] = None,
+              on_memoize: Callable[[MemoizeEvent], None] = None) -> None:
+    """Call ``on_request`` after every ``get_json`` request and
+    ``on_memoize`` on every access to a ``memoize`` property.
+    Hooks run on the calling thread and must not raise.
+    """
+    global _request_hooks, _memoize_hooks
+    if on_request is not None:
+        _request_hooks += (on_request,)
+    if on_memoize is not None:
+        _memoize_hooks += (on_memoize,)
+        _rebind_memoized()
+
+
+def remove_hooks(on_request: Callable[[RequestEvent], None] = None,
+                 on_memoize: Callable[[MemoizeEvent], None] = None) -> None:
+    """Unregister hooks added with ``add_hooks``"""
+    global _request_hooks, _memoize_hooks
+    _request_hooks = tuple(hook for hook in _request_hooks
+                           if hook != on_request)
+    _memoize_hooks = tuple(hook for hook in _memoize_hooks
+                           if hook != on_memoize)
+    _rebind_memoized()
+
+
+def _send_once(url: str, **kwargs: Any) -> requests.Response:
+    """Send a GET over the shared session, within the scheduler's
+    budget when one is configured.
+    """
+    scheduler = _scheduler
+    if scheduler is None:
+        return get_session().get(url, **kwargs)
+    with scheduler.slot() as feedback:
+        response = get_session().get(url, **kwargs)
+        feedback["headers"] = response.headers
+    return response
+
+
+def _send(url: str, **kwargs: Any) -> requests.Response:
+    """Send a GET, hedged when a hedging policy is configured.
+    """
+    policy = _hedging
+    if policy is None:
+        return _send_once(url, **kwargs)
+    return policy.run(lambda: _send_once(url, **kwargs),
+                      discard=lambda response: response.close())
+
+
+def cache_stats() -> Dict[str, int]:
+    """Counters of the validation cache used by ``get_json``.
+    """
+    return _cache.stats() if _cache is not None else {}
+
+
+def _fetch_json(url: str) -> Tuple[Any, Dict]:
+    """Get the JSON body and the links of a remote URL, reporting to
+    the request hooks when any is registered.
+    """
+    hooks = _request_hooks
+    if not hooks:
+        return _load_json(url)
+    probe: Dict[str, Any] = {}
+    error = None
+    start = time.perf_counter()
+    try:
+        return _load_json(url, probe)
+    except Exception as exc:
+        error = type(exc).__name__
+        raise
+    finally:
+        event = RequestEvent(
+            url, url_template(url), probe.get("status"),
+            probe.get("bytes", 0), probe.get("connect", 0.0),
+            probe.get("transfer", 0.0), probe.get("decode", 0.0),
+            time.perf_counter() - start, error)
+        for hook in hooks:
+            hook(event)
+
+
+def _load_json(url: str, probe: Dict[str, Any] = None) -> Tuple[Any, Dict]:
+    """Get the JSON body and the links of a remote URL, going through
+    the validation cache when it is enabled. Timings, status and size
+    are written to ``probe`` when one is given.
+    """
+    cache = _cache
+    entry = cache.lookup(url) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        cache.hit(url, entry)
+        return decode_json(entry.content), entry.links
+
+    headers = {}
+    if entry is not None and entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry is not None and entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    if probe is None:
+        response = _send(url, headers=headers) if headers else _send(url)
+    else:
+        sent = time.perf_counter()
+        response = _send(url, headers=headers) if headers else _send(url)
+        received = time.perf_counter()
+        probe["status"] = response.status_code
+        probe["connect"] = response.elapsed.total_seconds()
+        probe["transfer"] = max(received - sent - probe["connect"], 0.0)
+
+    revalidated = entry is not None and response.status_code == 304
+    content = entry.content if revalidated else response.content
+    if probe is None:
+        body = decode_json(content)
+    else:
+        decoding = time.perf_counter()
+        body = decode_json(content)
+        probe["decode"] = time.perf_counter() - decoding
+        probe["bytes"] = 0 if revalidated else len(content)
+    if revalidated:
+        cache.hit(url, entry, revalidated=True)
+        return body, entry.links
+    if cache is not None:
+        cache.miss()
+        cache.store(url, response)
+    return body, response.links
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def decode_json(content: bytes) -> Any:
+    """Decode a JSON body as UTF-8, as RFC 8259 requires.
+    Unlike ``response.json()``, a body without a declared charset is
+    never run through charset detection. Uses orjson when installed.
+    """
+    if content.startswith(codecs.BOM_UTF8):
+        content = content[len(codecs.BOM_UTF8):]
+    return _loads(content)
+
+
 def get_json(url: str) -> Dict:
     """Get JSON from remote URL.
     """
-    response = requests.get(url)
-    return response.json()
+    return _fetch_json(url)[0]
+
+
+def get_json_many(urls: Iterable[str],
+                  max_workers: int = None) -> List[Any]:
+    """Get JSON from many remote URLs concurrently over the shared pool.
+    Results are returned in the order of ``urls``. By default there is
+    one worker per connection of the shared session's pool.
+    """
+    if max_workers is None:
+        max_workers = _pool_size
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(get_json, urls))
+
+
+def get_json_pages(url: str) -> Iterator[Any]:
+    """Iterate over the JSON pages of a paginated remote resource.
+    Pages are fetched one at a time by following the
+    ``Link: <...>; rel="next"`` response header, so only the page
+    being consumed is held in memory.
+    """
+    while url:
+        page, links = _fetch_json(url)
+        yield page
+        url = links.get("next", {}).get("url")
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Incrementally decode a top-level JSON array from UTF-8 chunks.
+    Each element is yielded as soon as it is complete, so peak memory is
+    bounded by the largest element rather than by the whole document.
+    Example
+    -------
+    >>> list(iter_json_array([b'[{"a": 1}, {"a"', b': 2}]']))
+    [{'a': 1}, {'a': 2}]
+    """
+    chunks = iter(chunks)
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos, eof = "", 0, False
+
+    def read(min_chars: int) -> bool:
+        """Drop the consumed prefix and append at least ``min_chars``"""
+        nonlocal buffer, pos, eof
+        parts, size = [buffer[pos:]], 0
+        while size < min_chars and not eof:
+            chunk = next(chunks, None)
+            text = utf8.decode(chunk or b"", final=chunk is None)
+            eof = chunk is None
+            parts.append(text)
+            size += len(text)
+        buffer, pos = "".join(parts), 0
+        return size > 0
+
+    def skip_whitespace() -> str:
+        """Advance to the next significant character, '' at the end"""
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or not read(1):
+                return buffer[pos:pos + 1]
+
+    read(1)
+    if buffer.startswith(codecs.BOM_UTF8.decode()):
+        pos = 1
+    if skip_whitespace() != "[":
+        raise ValueError("Expected a JSON array")
+    pos += 1
+    if skip_whitespace() == "]":
+        return
+    while True:
+        try:
+            value, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Grow geometrically so that large elements stay linear
+            if not read(max(len(buffer) - pos, 1)):
+                raise
+            continue
+        if not eof and buffer[pos] in "-0123456789" \
+                and _NUMBER_TAIL.fullmatch(buffer, end):
+            # The number may continue in the next chunk, e.g. "1." "5"
+            if read(1):
+                continue
+        yield value
+        pos = end
+        separator = skip_whitespace()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError("Expected ',' or ']' at {!r}".format(separator))
+        pos += 1
+        skip_whitespace()
+
+
+def get_json_stream(url: str, chunk_size: int = 65536) -> Iterator[Any]:
+    """Iterate over the elements of a paginated remote JSON array while
+    it downloads, following the ``Link: <...>; rel="next"`` header.
+    Streamed responses bypass the validation cache.
+    """
+    while url:
+        response = _send(url, stream=True)
+        try:
+            yield from iter_json_array(response.iter_content(chunk_size))
+        finally:
+            response.close()
+        url = response.links.get("next", {}).get("url")
+
+
+def _report_memoize(name: str, hit: bool, seconds: float) -> None:
+    """Call the memoize hooks"""
+    event = MemoizeEvent(name, hit, seconds)
+    for hook in _memoize_hooks:
+        hook(event)
+
+
+class _MemoizedProperty(property):
+    """Property of ``memoize``, rebound on its class to the variant
+    that reports to the memoize hooks while any is registered.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        _memoized.append((weakref.ref(owner), name, self, self.hooked))
+        if _memoize_hooks:
+            setattr(owner, name, self.hooked)
+
+
+# Every memoize property: (owner, name, plain, hooked)
+_memoized: List[Tuple[weakref.ref, str, property, property]] = []
+
+
+def _rebind_memoized() -> None:
+    """Bind the variant of every memoize property matching the hooks"""
+    hooked = bool(_memoize_hooks)
+    _memoized[:] = [item for item in _memoized if item[0]() is not None]
+    for owner_ref, name, plain, hooked_property in _memoized:
+        owner = owner_ref()
+        current = owner.__dict__.get(name)
+        if current is plain or current is hooked_property:
+            setattr(owner, name, hooked_property if hooked else plain)
 
 
 def memoize(fn: Callable) -> Callable:
     """Decorator to memoize a method.
+    Without memoize hooks a hit is one attribute lookup, cheaper than
+    ``hasattr`` followed by ``getattr``; the variant that reports to
+    the hooks is only bound while they are registered.
     Example
     -------
     class MyClass:
@@ -64,12 +640,190 @@ def memoize(fn: Callable) -> Callable:
     42
     """
     attr_name = "_{}".format(fn.__name__)
+    name = fn.__qualname__
 
     @wraps(fn)
     def memoized(self):
         """"memoized wraps"""
+        try:
+            return getattr(self, attr_name)
+        except AttributeError:
+            pass
+        setattr(self, attr_name, fn(self))
+        return getattr(self, attr_name)
+
+    @wraps(fn)
+    def reported(self):
+        """"memoized wraps, reporting to the memoize hooks"""
         if not hasattr(self, attr_name):
+            start = time.perf_counter()
             setattr(self, attr_name, fn(self))
+            _report_memoize(name, False, time.perf_counter() - start)
+        else:
+            _report_memoize(name, True, 0.0)
         return getattr(self, attr_name)
 
+    prop = _MemoizedProperty(memoized)
+    prop.hooked = property(reported)
+    return prop
+
+
+def async_memoize(fn: Callable[..., Awaitable]) -> Callable:
+    """Decorator to memoize a coroutine method.
+    The awaited result is cached, and concurrent awaiters of a cold
+    value share one in-flight task. A failed call is not cached.
+    Example
+    -------
+    class MyClass:
+        @async_memoize
+        async def a_method(self):
+            print("a_method called")
+            return 42
+    >>> my_object = MyClass()
+    >>> await asyncio.gather(my_object.a_method, my_object.a_method)
+    a_method called
+    [42, 42]
+    >>> await my_object.a_method
+    42
+    """
+    attr_name = "_{}".format(fn.__name__)
+    pending_name = "_{}_pending".format(fn.__name__)
+
+    @wraps(fn)
+    async def memoized(self):
+        """"memoized wraps"""
+        if hasattr(self, attr_name):
+            return getattr(self, attr_name)
+        task = getattr(self, pending_name, None)
+        if task is None:
+            task = asyncio.ensure_future(fn(self))
+            setattr(self, pending_name, task)
+
+            def done(task: asyncio.Future) -> None:
+                delattr(self, pending_name)
+                if not task.cancelled() and task.exception() is None:
+                    setattr(self, attr_name, task.result())
+
+            task.add_done_callback(done)
+        # Shielded so that a cancelled awaiter does not cancel the others
+        return await asyncio.shield(task)
+
     return property(memoized)
+
+
+class _MemoSlot:
+    """Per-instance state of a ``memoize_ttl`` property"""
+    __slots__ = ("value", "expires_at", "lock", "refreshing")
+
+    def __init__(self) -> None:
+        self.value: Any = None
+        self.expires_at: Optional[float] = None
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+    def is_valid(self, now: float) -> bool:
+        """Whether the slot holds a value that has not expired"""
+        return self.expires_at is not None and now < self.expires_at
+
+
+class TTLMemoized:
+    """Thread-safe memoized property with expiry.
+    Concurrent first accesses run the wrapped method once while the other
+    callers wait for its result. With ``refresh_ahead``, a read within
+    ``refresh_ahead`` seconds of expiry recomputes the value in a
+    background thread and keeps serving the current one meanwhile.
+    The cache of an instance is controlled through the class attribute:
+    ``MyClass.a_method.invalidate(my_object)``.
+    """
+
+    def __init__(self, fn: Callable, ttl: float = None,
+                 refresh_ahead: float = None) -> None:
+        """Init method of TTLMemoized"""
+        wraps(fn)(self)
+        self.fn = fn
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.attr_name = "_{}_memo".format(fn.__name__)
+        self._slot_lock = threading.Lock()
+
+    def _slot(self, obj: Any) -> _MemoSlot:
+        """Get, creating it once, the slot of ``obj``"""
+        slot = obj.__dict__.get(self.attr_name)
+        if slot is None:
+            with self._slot_lock:
+                slot = obj.__dict__.setdefault(self.attr_name, _MemoSlot())
+        return slot
+
+    def _compute(self, obj: Any, slot: _MemoSlot) -> Any:
+        """Run the wrapped method and store its result; needs slot.lock"""
+        value = self.fn(obj)
+        slot.value = value
+        slot.expires_at = (float("inf") if self.ttl is None
+                           else time.monotonic() + self.ttl)
+        return value
+
+    def _refresh_in_background(self, obj: Any, slot: _MemoSlot) -> None:
+        """Recompute the value of ``obj`` in a daemon thread"""
+        def refresh():
+            try:
+                with slot.lock:
+                    self._compute(obj, slot)
+            finally:
+                slot.refreshing = False
+
+        with self._slot_lock:
+            if slot.refreshing:
+                return
+            slot.refreshing = True
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def __get__(self, obj: Any, objtype: type = None) -> Any:
+        if obj is None:
+            return self
+        slot = self._slot(obj)
+        now = time.monotonic()
+        if slot.is_valid(now):
+            if (self.refresh_ahead is not None
+                    and slot.expires_at - now <= self.refresh_ahead):
+                self._refresh_in_background(obj, slot)
+            return slot.value
+        with slot.lock:
+            if slot.is_valid(time.monotonic()):
+                return slot.value
+            return self._compute(obj, slot)
+
+    def invalidate(self, obj: Any) -> None:
+        """Drop the value cached for ``obj``"""
+        self._slot(obj).expires_at = None
+
+    def refresh(self, obj: Any) -> Any:
+        """Recompute and return the value cached for ``obj``"""
+        slot = self._slot(obj)
+        with slot.lock:
+            return self._compute(obj, slot)
+
+
+def memoize_ttl(ttl: float = None,
+                refresh_ahead: float = None) -> Callable[[Callable],
+                                                         TTLMemoized]:
+    """Decorator to memoize a method for ``ttl`` seconds.
+    Example
+    -------
+    class MyClass:
+        @memoize_ttl(ttl=60, refresh_ahead=5)
+        def a_method(self):
+            print("a_method called")
+            return 42
+    >>> my_object = MyClass()
+    >>> my_object.a_method
+    a_method called
+    42
+    >>> MyClass.a_method.invalidate(my_object)
+    >>> my_object.a_method
+    a_method called
+    42
+    """
+    def decorator(fn: Callable) -> TTLMemoized:
+        return TTLMemoized(fn, ttl, refresh_ahead)
+
+    return decorator